@@ -0,0 +1,236 @@
+import json
+import logging
+import math
+import os
+from collections import Counter
+
+from atomic import write_atomic
+from dates import article_timestamp, format_day
+
+STATS_FILE = "stats.json"
+
+
+def polarity_bin(polarity):
+    """
+    Histogram bin of a polarity score: rounded to one decimal, halves up
+    (the same binning the dashboard chart has always used).
+    """
+    return f"{math.floor(polarity * 10 + 0.5) / 10:.1f}"
+
+
+class RunningStats:
+    """
+    Aggregates over an article collection that can be updated incrementally.
+
+    Holds per-source, per-label and per-source-per-label counts, polarity
+    and subjectivity sums (plus sum of squares for polarity), a polarity
+    histogram, per-day counts and polarity sums, the publish-date bounds
+    and the number of near-duplicate clusters seen. Updating with a day's
+    new articles costs O(new articles); no field needs the full history.
+
+    Cluster IDs are handed out in increasing order as articles are
+    stored, so an article whose cluster_id is at or above next_cluster is
+    the first of a new story; articles must be added in store order.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.sources = Counter()
+        self.labels = Counter()
+        self.source_labels = {}
+        self.polarity_sum = 0.0
+        self.polarity_sumsq = 0.0
+        self.subjectivity_sum = 0.0
+        self.polarity_bins = Counter()
+        self.day_counts = Counter()
+        self.day_polarity_sums = Counter()
+        self.oldest = None
+        self.newest = None
+        self.cluster_count = 0  # Distinct near-duplicate clusters
+        self.next_cluster = 0  # One past the highest cluster ID seen
+        self.clustered = 0
+
+    def update(self, articles):
+        for article in articles:
+            source = article['source']
+            sentiment = article['sentiment']
+            label = sentiment['label']
+            polarity = sentiment['polarity']
+
+            self.total += 1
+            self.sources[source] += 1
+            self.labels[label] += 1
+            self.source_labels.setdefault(source, Counter())[label] += 1
+            self.polarity_sum += polarity
+            self.polarity_sumsq += polarity * polarity
+            self.subjectivity_sum += sentiment['subjectivity']
+            self.polarity_bins[polarity_bin(polarity)] += 1
+            cluster = article.get('cluster_id')
+            if cluster is not None:
+                if cluster >= self.next_cluster:
+                    self.cluster_count += 1
+                    self.next_cluster = cluster + 1
+                self.clustered += 1
+
+            ts = article_timestamp(article)
+            if ts is not None:
+                day = format_day(ts)
+                self.day_counts[day] += 1
+                self.day_polarity_sums[day] += polarity
+                if self.oldest is None or ts < self.oldest:
+                    self.oldest = ts
+                if self.newest is None or ts > self.newest:
+                    self.newest = ts
+        return self
+
+    @property
+    def stories(self):
+        """
+        Distinct stories: one per near-duplicate cluster, plus one per
+        article stored before clustering existed (no cluster_id).
+        """
+        return self.cluster_count + self.total - self.clustered
+
+    @property
+    def avg_polarity(self):
+        return self.polarity_sum / self.total if self.total else 0.0
+
+    @property
+    def avg_subjectivity(self):
+        return self.subjectivity_sum / self.total if self.total else 0.0
+
+    @property
+    def polarity_stddev(self):
+        if not self.total:
+            return 0.0
+        variance = self.polarity_sumsq / self.total - self.avg_polarity ** 2
+        return math.sqrt(max(0.0, variance))
+
+    def summary(self):
+        """
+        Returns the statistics dict reported by the daily collection.
+        """
+        if not self.total:
+            return {}
+        return {
+            'total_articles': self.total,
+            'stories': self.stories,
+            'sources': len(self.sources),
+            'oldest_article': format_day(self.oldest) if self.oldest is not None else 'N/A',
+            'newest_article': format_day(self.newest) if self.newest is not None else 'N/A',
+            'sentiment_distribution': self.labels,
+            'top_sources': self.sources.most_common(5)
+        }
+
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'sources': dict(self.sources),
+            'labels': dict(self.labels),
+            'source_labels': {source: dict(labels) for source, labels in self.source_labels.items()},
+            'polarity_sum': self.polarity_sum,
+            'polarity_sumsq': self.polarity_sumsq,
+            'subjectivity_sum': self.subjectivity_sum,
+            'polarity_bins': dict(self.polarity_bins),
+            'day_counts': dict(self.day_counts),
+            'day_polarity_sums': dict(self.day_polarity_sums),
+            'oldest': self.oldest,
+            'newest': self.newest,
+            'cluster_count': self.cluster_count,
+            'next_cluster': self.next_cluster,
+            'clustered': self.clustered,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.total = data['total']
+        stats.sources = Counter(data['sources'])
+        stats.labels = Counter(data['labels'])
+        stats.source_labels = {source: Counter(labels) for source, labels in data['source_labels'].items()}
+        stats.polarity_sum = data['polarity_sum']
+        stats.polarity_sumsq = data['polarity_sumsq']
+        stats.subjectivity_sum = data['subjectivity_sum']
+        stats.polarity_bins = Counter(data['polarity_bins'])
+        stats.day_counts = Counter(data['day_counts'])
+        stats.day_polarity_sums = Counter(data['day_polarity_sums'])
+        stats.oldest = data['oldest']
+        stats.newest = data['newest']
+        if 'clusters' in data:  # Written by older versions: every cluster ID
+            stats.cluster_count = len(data['clusters'])
+            stats.next_cluster = max(data['clusters'], default=-1) + 1
+        else:
+            stats.cluster_count = data['cluster_count']
+            stats.next_cluster = data['next_cluster']
+        stats.clustered = data.get('clustered', 0)
+        return stats
+
+
+def log_statistics(stats, added_today=None):
+    """
+    Logs the COLLECTION STATISTICS report for `stats` (a RunningStats).
+    """
+    summary = stats.summary()
+    logging.info("\n" + "=" * 60)
+    logging.info("COLLECTION STATISTICS")
+    logging.info("=" * 60)
+    if not summary:
+        logging.info("No articles collected yet")
+        return
+
+    logging.info(f"Total articles in database: {summary['total_articles']}")
+    if added_today is not None:
+        logging.info(f"New articles added today: {added_today}")
+    logging.info(f"Distinct stories: {summary['stories']}")
+    logging.info(f"Number of sources: {summary['sources']}")
+    logging.info(f"Date range: {summary['oldest_article']} to {summary['newest_article']}")
+    logging.info(f"\nSentiment distribution:")
+    for sentiment, count in summary['sentiment_distribution'].items():
+        logging.info(f"  {sentiment.capitalize()}: {count}")
+    logging.info(f"\nTop 5 sources:")
+    for source, count in summary['top_sources']:
+        logging.info(f"  {source}: {count} articles")
+
+
+def stats_path(store):
+    return os.path.join(store.root, STATS_FILE)
+
+
+def load_store_stats(store):
+    """
+    Loads the persisted stats for `store`. If they are missing or do not
+    match the store's article count (e.g. a run died between committing
+    articles and saving stats), they are rebuilt with one pass over the store:
+    a vectorized scan of its column files when NumPy is installed, else by
+    reading every article.
+    """
+    path = stats_path(store)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stats = RunningStats.from_dict(json.load(f))
+            if stats.total == len(store):
+                return stats
+            logging.warning(f"{path} is out of date, rebuilding from the store")
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable stats file {path}: {e}")
+    return scan_store_stats(store)
+
+
+def scan_store_stats(store):
+    """
+    Computes the RunningStats of every article in `store` from scratch.
+    """
+    from columns import load_columns
+    try:
+        columns = load_columns(store)
+    except (ImportError, ValueError):  # No NumPy, or no column files (COLUMNS_ENABLED off)
+        return RunningStats().update(store.iter_articles())
+    return columns.running_stats()
+
+
+def save_store_stats(store, stats):
+    """
+    Writes the stats next to the store's manifest (temp file + rename).
+    """
+    write_atomic(stats_path(store), lambda f: json.dump(stats.to_dict(), f, indent=4))
@@ -0,0 +1,133 @@
+import sys
+
+from dates import TIMESTAMP_FIELD
+
+# Top-level keys of the JSON article schema, in the order they are written.
+# 'sentiment' and 'cluster_id' follow them.
+FIELDS = ('source', 'title', 'description', 'link', 'pubDate', TIMESTAMP_FIELD, 'author', 'topics')
+SENTIMENT_FIELDS = ('polarity', 'subjectivity', 'label')
+
+# Identical topic lists share one tuple
+_topic_tuples = {}
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def _topics(topics):
+    if topics is None:
+        return None
+    key = tuple(_intern(topic) for topic in topics)
+    return _topic_tuples.setdefault(key, key)
+
+
+class Article:
+    """
+    Compact in-memory article record.
+
+    Fields live in __slots__ instead of a per-article dict, the sentiment
+    scores are flattened onto the record, and repeated strings (source
+    names, labels, topics) are interned so records share one copy.
+
+    The record also behaves like the article dicts it replaces:
+    article['title'], article.get('link'), article['sentiment'] (built on
+    access), 'pubTimestamp' in article and article['cluster_id'] = 3 all
+    work. to_dict() returns the JSON schema; keys the record was never
+    given are left out, as before, and unknown keys are kept in `extra`.
+    """
+
+    __slots__ = FIELDS + SENTIMENT_FIELDS + ('cluster_id', 'extra')
+
+    def __init__(self, sentiment=None, **fields):
+        self.extra = None
+        for key, value in fields.items():
+            self[key] = value
+        if sentiment is not None:
+            self['sentiment'] = sentiment
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds a record from an article dict (e.g. a line of the store).
+        Records are returned unchanged.
+        """
+        if isinstance(data, cls):
+            return data
+        return cls(**data)
+
+    def to_dict(self):
+        data = {}
+        for key in FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                data[key] = list(value) if key == 'topics' and value is not None else value
+        if hasattr(self, 'label'):
+            data['sentiment'] = self['sentiment']
+        if hasattr(self, 'cluster_id'):
+            data['cluster_id'] = self.cluster_id
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getitem__(self, key):
+        if key == 'sentiment':
+            try:
+                return {'polarity': self.polarity, 'subjectivity': self.subjectivity, 'label': self.label}
+            except AttributeError:
+                raise KeyError(key) from None
+        if key in _SLOT_KEYS:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return list(value) if key == 'topics' and value is not None else value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'sentiment':
+            self.polarity = value['polarity']
+            self.subjectivity = value['subjectivity']
+            self.label = sys.intern(value['label'])
+        elif key == 'topics':
+            self.topics = _topics(value)
+        elif key in ('source', 'author'):
+            setattr(self, key, _intern(value))
+        elif key in _SLOT_KEYS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"Article({self.to_dict()!r})"
+
+
+_MISSING = object()
+_SLOT_KEYS = frozenset(FIELDS + ('cluster_id',))
+
+
+def to_json(obj):
+    """
+    `default` hook for json.dump / json.dumps, so lists that mix records
+    and plain dicts serialize to the usual schema.
+    """
+    if isinstance(obj, Article):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,44 @@
+import gzip
+import os
+import shutil
+
+
+def write_atomic(path, write):
+    """
+    Calls `write(f)` on a temp file next to `path`, fsyncs it and renames
+    it over `path`. Readers (and a run after a crash or power loss) see
+    either the old file or the complete new one, never a truncated file.
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_atomic_gzip(path, lines):
+    """
+    Like write_atomic(), for a gzip file holding `lines`. The gzip header
+    carries no name or mtime, so the same lines always give the same bytes.
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as raw:
+        with gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0) as f:
+            for line in lines:
+                f.write(line.encode('utf-8'))
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+
+
+def copy_atomic(src, path):
+    """
+    Like write_atomic(), with a copy of the file `src` as the content.
+    """
+    tmp_path = path + '.tmp'
+    with open(src, 'rb') as f, open(tmp_path, 'wb') as out:
+        shutil.copyfileobj(f, out)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp_path, path)
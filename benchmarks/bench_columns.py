@@ -0,0 +1,66 @@
+"""
+Benchmark: statistics over the historical store, JSON scan vs column files.
+
+Builds a synthetic store (see feed_server.Corpus) in a temporary
+directory, then times rebuilding the RunningStats by reading every JSONL
+article against the vectorized scan of the memory-mapped column files,
+plus a one-month slice. Needs NumPy.
+
+Usage:
+    python benchmarks/bench_columns.py [--articles 200000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aggregates import RunningStats
+from columns import load_columns
+from storage import ArticleStore
+
+from bench_search import BATCH_SIZE, articles
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {(time.perf_counter() - start) * 1000:>10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--articles', type=int, default=200000)
+    parser.add_argument('--days', type=int, default=365)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_columns_') as workdir:
+        store = ArticleStore(os.path.join(workdir, 'history'))
+        batch = []
+        for article in articles(args.articles, args.days):
+            batch.append(article)
+            if len(batch) >= BATCH_SIZE:
+                store.append(batch)
+                batch = []
+        if batch:
+            store.append(batch)
+        print(f"Store: {len(store)} articles in {len(store.manifest['segments'])} segments")
+
+        scanned = timed("RunningStats from JSONL", lambda: RunningStats().update(store.iter_articles()))
+        columns = timed("load_columns (memory map)", lambda: load_columns(store))
+        vectorized = timed("RunningStats from columns", columns.running_stats)
+        timed("polarity histogram from columns", columns.polarity_bins)
+        start = datetime.now(timezone.utc) - timedelta(days=30)
+        timed("last 30 days, JSONL (segment pruning)", lambda: sum(1 for _ in store.iter_articles(start=start)))
+        month = timed("last 30 days, columns", lambda: columns.between(start=start))
+        timed("  mean polarity per source", lambda: [
+            month.polarity[month.source == i].mean() for i in range(len(month.dictionary['source']))
+        ])
+        assert scanned.total == vectorized.total and scanned.polarity_bins == vectorized.polarity_bins
+
+
+if __name__ == "__main__":
+    main()
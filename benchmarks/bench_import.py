@@ -0,0 +1,63 @@
+"""
+Benchmark: interpreter startup plus import time of each entry-point module.
+
+Runs `python -c "import <module>"` in fresh processes and reports the
+median wall time above a bare interpreter, along with which heavy
+dependencies the import pulled in.
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What each CLI command imports before doing any work
+TARGETS = [
+    ('cli', 'cli'),
+    ('stats', 'aggregates, storage'),
+    ('dashboard', 'dashboard'),
+    ('collect', 'daily_scraper'),
+    ('scrape', 'scrapper'),
+    ('daemon', 'scheduler'),
+]
+HEAVY = ['requests', 'lxml', 'bs4', 'textblob', 'nltk']
+
+
+def run(code, repeat, workdir):
+    # Runs in an empty directory so imports that open log files leave nothing behind
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    times = []
+    output = ''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, '-c', code], cwd=workdir, env=env, check=True, capture_output=True, text=True
+        ).stdout
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), output.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_import_') as workdir:
+        baseline, _ = run('pass', args.repeat, workdir)
+        print(f"Bare interpreter: {baseline * 1000:.0f} ms (subtracted below), median of {args.repeat}")
+        print(f"{'command':<10} {'modules':<22} {'import ms':>10}  heavy dependencies loaded")
+        check = f"import sys; print(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+        for command, modules in TARGETS:
+            elapsed, loaded = run(f"import {modules}; {check}", args.repeat, workdir)
+            print(f"{command:<10} {modules:<22} {(elapsed - baseline) * 1000:>10.0f}  {loaded or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Benchmark: the full daily collection (run_daily_collection) against a local
+stand-in for the RSS feeds or NewsAPI (see feed_server.py).
+
+Each run starts from an empty working directory (fresh history store and
+caches), so every run fetches, parses, scores and stores the whole corpus.
+Reports articles/sec, p50/p99 timing per pipeline stage across runs, and
+peak Python memory from one extra run under tracemalloc.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--mode rss|newsapi] [--runs 5]
+        [--feeds 20] [--items 200] [--latency-ms 20] [--error-rate 0.0]
+        [--max-articles 1000] [--keep] [--verbose]
+"""
+import argparse
+import functools
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+import fetcher
+import newsapi_fetcher
+import scrapper
+from aggregates import RunningStats
+from near_dup import NearDupIndex
+from rollups import Rollups
+from search_index import SearchIndex
+from storage import ArticleStore
+from topics import load_topics
+
+from feed_server import feed_urls, start_server
+
+# (stage, owner, attribute). 'parse' runs inside 'fetch' (feeds are parsed
+# as they arrive), so their times overlap.
+STAGES = [
+    ('fetch', fetcher, 'fetch_feeds'),
+    ('fetch', newsapi_fetcher, 'fetch_newsapi_articles'),
+    ('parse', scrapper, 'parse_feed_items'),
+    ('sentiment', scrapper, 'add_sentiment'),
+    ('near_dup', NearDupIndex, 'assign_articles'),
+    ('store', ArticleStore, 'append'),
+    ('search', SearchIndex, 'add'),
+    ('rollups', Rollups, 'add'),
+    ('stats', RunningStats, 'update'),
+]
+
+
+def instrument(owner, name, stage, timings, counts=None):
+    """
+    Wraps owner.name so each call's elapsed time is recorded under `stage`
+    (and, with `counts`, the length of what it returned).
+    """
+    original = getattr(owner, name)
+
+    @functools.wraps(original)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        result = None
+        try:
+            result = original(*args, **kwargs)
+            return result
+        finally:
+            timings[stage].append(time.perf_counter() - start)
+            if counts is not None and result is not None:
+                counts[stage].append(len(result))
+
+    setattr(owner, name, timed)
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of a non-empty list.
+    """
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def configure(args, base_url):
+    """
+    Points config at the local server. Quota and rate limits are lifted
+    so the benchmark measures the pipeline, not the limiter's sleeps.
+    """
+    config.USE_NEWS_API = args.mode == 'newsapi'
+    config.NEWS_SOURCES = feed_urls(base_url, args.feeds)
+    config.NEWS_API_KEY = 'benchmark'
+    config.NEWS_API_DAILY_QUOTA = 10 ** 6
+    config.NEWS_API_REQUESTS_PER_SECOND = 10 ** 6
+    config.MAX_ARTICLES = args.max_articles
+    config.USE_FEED_CACHE = False
+    newsapi_fetcher.NEWS_API_URL = f"{base_url}/v2/everything"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mode', choices=('rss', 'newsapi'), default='rss')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--feeds', type=int, default=20)
+    parser.add_argument('--items', type=int, default=200, help="items per feed / NewsAPI articles per day")
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--max-articles', type=int, default=1000, help="NewsAPI mode only")
+    parser.add_argument('--keep', action='store_true', help="keep the run directories for inspection")
+    parser.add_argument('--verbose', action='store_true', help="keep the pipeline's INFO logging")
+    args = parser.parse_args()
+
+    keyword = next(iter(load_topics().values()))[0].rstrip('*')
+    server, base_url = start_server(0, args.items, args.latency_ms / 1000, args.error_rate, keyword)
+    configure(args, base_url)
+
+    workdir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    os.chdir(workdir)
+    import daily_scraper  # Opens scraper_history.log in the working directory
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    timings = defaultdict(list)
+    counts = defaultdict(list)
+    for stage, owner, name in STAGES:
+        instrument(owner, name, stage, timings)
+    instrument(daily_scraper, 'scrape_news_sources', 'scrape', timings, counts)
+    instrument(daily_scraper, 'scrape_with_newsapi', 'scrape', timings, counts)
+    instrument(daily_scraper, 'run_daily_collection', 'total', timings)
+
+    print(f"Mode: {args.mode}, {args.runs} run(s), server {base_url}, "
+          f"latency {args.latency_ms:g} ms, error rate {args.error_rate:g}")
+    for run in range(args.runs + 1):
+        os.chdir(tempfile.mkdtemp(prefix=f'run{run}_', dir=workdir))
+        if run < args.runs:
+            daily_scraper.run_daily_collection()
+            continue
+        # Last run only measures memory: tracemalloc slows everything down
+        kept = {stage: list(values) for stage, values in timings.items()}
+        tracemalloc.start()
+        daily_scraper.run_daily_collection()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        timings.clear()
+        timings.update(kept)
+    server.shutdown()
+
+    articles = sum(counts['scrape'][:args.runs])
+    total = sum(timings['total'])
+    print(f"Articles: {articles // max(1, args.runs)} per run, "
+          f"{articles / total if total else 0:,.0f} articles/s end to end")
+    print(f"\n{'stage':<10} {'calls':>6} {'p50 ms':>10} {'p99 ms':>10} {'total ms':>11}")
+    order = ['scrape', 'fetch', 'parse', 'sentiment', 'near_dup', 'store', 'search', 'rollups', 'stats', 'total']
+    for stage in order:
+        values = timings.get(stage)
+        if not values:
+            continue
+        print(f"{stage:<10} {len(values):>6} {percentile(values, 50) * 1000:>10.1f} "
+              f"{percentile(values, 99) * 1000:>10.1f} {sum(values) * 1000:>11.1f}")
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    print(f"\nPeak Python memory (tracemalloc, one run): {peak / 1024 / 1024:.1f} MiB")
+    print(f"Max RSS of this process: {max_rss:.1f} MiB (sentiment worker processes not included)")
+    os.chdir(os.path.dirname(workdir))
+    if args.keep:
+        print(f"Run directories kept in {workdir}")
+    else:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: streaming lxml RSS parser vs the BeautifulSoup parser.
+
+Generates a synthetic RSS feed and times item extraction with both parsers,
+reporting items/sec and peak Python memory.
+
+Usage:
+    python benchmarks/bench_rss_parser.py [--items 2000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapper import _iter_items_bs4, _iter_items_lxml
+
+
+def make_feed(n_items):
+    """
+    Builds an RSS 2.0 document with `n_items` items as bytes.
+    """
+    now = datetime.now(timezone.utc)
+    items = []
+    for i in range(n_items):
+        pub_date = format_datetime(now - timedelta(minutes=i))
+        items.append(
+            "<item>"
+            f"<title>{escape(f'Story {i} about India and the world economy')}</title>"
+            f"<link>https://news.example.com/story/{i}</link>"
+            f"<pubDate>{pub_date}</pubDate>"
+            f"<description>{escape('Lorem ipsum dolor sit amet. ' * 8)}</description>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0"><channel><title>Benchmark</title>'
+        + ''.join(items)
+        + '</channel></rss>'
+    ).encode('utf-8')
+
+
+def run(name, parse, content, repeat):
+    best = float('inf')
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in parse(content))
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    sum(1 for _ in parse(content))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<6} {count:>7} items  {best * 1000:>9.1f} ms  "
+          f"{count / best:>10.0f} items/s  peak {peak / 1024 / 1024:>7.1f} MiB")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    content = make_feed(args.items)
+    print(f"Feed size: {len(content) / 1024:.0f} KiB, best of {args.repeat}")
+    bs4_time = run('bs4', _iter_items_bs4, content, args.repeat)
+    lxml_time = run('lxml', _iter_items_lxml, content, args.repeat)
+    print(f"Speedup: {bs4_time / lxml_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
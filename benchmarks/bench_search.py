@@ -0,0 +1,119 @@
+"""
+Benchmark: building the full-text search index and querying it.
+
+Indexes a synthetic archive (see feed_server.Corpus) into a temporary
+search index, then times a mix of keyword, phrase, prefix and filtered
+queries and reports p50/p99 latency per query.
+
+Corpus headlines come from a few dozen words, so each of those words
+matches a large share of the archive. Every description therefore also
+gets a few terms drawn from a Zipf-distributed vocabulary ('term<rank>'),
+which gives queries with realistic match counts. Ranking cost grows with
+the number of matching articles, which is reported next to the latency.
+
+Usage:
+    python benchmarks/bench_search.py [--articles 300000] [--repeat 20]
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from search_index import SearchIndex, fts_query
+
+from feed_server import SOURCES, Corpus
+
+BATCH_SIZE = 10000  # Articles per transaction, like one imported store segment
+VOCABULARY = 50000
+TERMS_PER_ARTICLE = 8
+
+
+def articles(n, days):
+    corpus = Corpus(days=days)
+    labels = ('positive', 'negative', 'neutral')
+    rng = random.Random(0)
+    ranks = range(1, VOCABULARY + 1)
+    cumulative = list(itertools.accumulate(1 / rank for rank in ranks))
+    for i in range(n):
+        article = corpus.article('bench', i)
+        terms = rng.choices(ranks, cum_weights=cumulative, k=TERMS_PER_ARTICLE)
+        yield {
+            'source': article['source'],
+            'title': article['title'],
+            'description': article['description'] + ' ' + ' '.join(f"term{rank}" for rank in terms),
+            'link': article['url'],
+            'pubDate': article['published'].isoformat(),
+            'pubTimestamp': int(article['published'].timestamp()),
+            'sentiment': {'polarity': (1 - i % 3) * 0.5, 'subjectivity': 0.5, 'label': labels[i % 3]},
+        }
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--articles', type=int, default=300000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    queries = [
+        ('rare term', "term20000", {}),
+        ('mid term', "term500", {}),
+        ('frequent term', "term10", {}),
+        ('two terms', "term50 term60", {}),
+        ('term + headline word', "term100 outage", {}),
+        ('prefix', "term1234*", {}),
+        ('phrase', '"court rejects"', {}),
+        ('phrase + source', '"court rejects"', {'source': SOURCES[0]}),
+        ('term + label', "term300", {'label': 'negative'}),
+        ('term + last week', "term200", {'start': now - timedelta(days=7)}),
+        ('all filters', "term100 election", {'source': SOURCES[1], 'label': 'positive',
+                                             'start': now - timedelta(days=90)}),
+        ('headline word', "outage", {}),
+        ('collection keyword', "india", {}),
+    ]
+
+    with tempfile.TemporaryDirectory(prefix='bench_search_') as workdir:
+        index = SearchIndex(os.path.join(workdir, 'search_index.sqlite3'))
+        elapsed = 0.0  # Indexing only, not generating the corpus
+        batch = []
+        covered = 0
+        for article in articles(args.articles, args.days):
+            batch.append(article)
+            if len(batch) >= BATCH_SIZE or covered + len(batch) == args.articles:
+                covered += len(batch)
+                start = time.perf_counter()
+                index.add(batch, covered)
+                elapsed += time.perf_counter() - start
+                batch = []
+        size = os.path.getsize(index.path)
+        print(f"Indexed {len(index)} articles in {elapsed:.1f}s "
+              f"({len(index) / elapsed:,.0f}/s), index {size / 1e6:.0f} MB")
+
+        print(f"{'query':<22} {'matches':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        for name, query, filters in queries:
+            matches = index.db.execute(
+                "SELECT COUNT(*) FROM search WHERE search MATCH ?", (fts_query(query),)
+            ).fetchone()[0]
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                index.search(query, **filters)
+                timings.append(time.perf_counter() - start)
+            print(f"{name:<22} {matches:>8} {percentile(timings, 50) * 1000:>8.2f} "
+                  f"{percentile(timings, 99) * 1000:>8.2f}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
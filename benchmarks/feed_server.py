@@ -0,0 +1,208 @@
+"""
+Local stand-in for the news feeds and NewsAPI, serving a synthetic corpus.
+
+Serves RSS 2.0 feeds at /feeds/<n>.xml and a NewsAPI-compatible
+/v2/everything endpoint (honours from, to, page and pageSize), with
+configurable corpus size, response latency and error rate, so the
+scrapers can be benchmarked without touching the internet.
+
+Usage:
+    python benchmarks/feed_server.py [--port 8765] [--feeds 20] [--items 200]
+                                     [--latency-ms 50] [--error-rate 0.0]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+SUBJECTS = ["Government", "Central bank", "Tech giant", "Court", "Election body", "Startup",
+            "Ministry", "Opposition", "Scientists", "Farmers", "Airline", "Stock market"]
+VERBS = ["announces", "rejects", "celebrates", "warns about", "plans", "delays",
+         "welcomes", "criticises", "unveils", "investigates"]
+OBJECTS = ["new policy", "record growth", "major outage", "trade deal", "budget cuts",
+           "strong results", "security breach", "green energy plan", "heavy losses", "reform bill"]
+TONES = ["amid strong optimism", "after a terrible week", "in a surprise move",
+         "despite fierce criticism", "with great success", "as concerns grow", ""]
+SOURCES = ["Daily Planet", "Global Wire", "Morning Post", "Evening Standard", "News Network",
+           "The Chronicle", "Metro Times", "World Report"]
+
+
+class Corpus:
+    """
+    Deterministic synthetic articles. About `topic_share` of titles mention
+    `keyword`; `near_dup_share` of articles re-use an earlier headline with a
+    different URL and a suffix, like a syndicated wire story.
+    """
+
+    def __init__(self, keyword="India", seed=0, topic_share=0.7, near_dup_share=0.2, days=7):
+        self.keyword = keyword
+        self.seed = seed
+        self.topic_share = topic_share
+        self.near_dup_share = near_dup_share
+        self.days = days
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def article(self, stream, i):
+        """
+        Returns article `i` of `stream` (a feed number or a day) as a dict.
+        """
+        rng = random.Random(f"{self.seed}:{stream}:{i}")
+        story = rng.randrange(max(1, i)) if i and rng.random() < self.near_dup_share else i
+        story_rng = random.Random(f"{self.seed}:{stream}:story:{story}")
+        words = [story_rng.choice(SUBJECTS), story_rng.choice(VERBS), story_rng.choice(OBJECTS),
+                 story_rng.choice(TONES)]
+        if story_rng.random() < self.topic_share:
+            words.insert(1, f"in {self.keyword}")
+        title = " ".join(word for word in words if word)
+        if story != i:
+            title += f" - {rng.choice(SOURCES)}"
+        description = (f"{title}. " + " ".join(story_rng.choice(OBJECTS) for _ in range(6))
+                       + f", reported by {story_rng.choice(SOURCES)}.")
+        published = self.now - timedelta(seconds=rng.randrange(self.days * 86400))
+        return {
+            'source': rng.choice(SOURCES),
+            'title': title,
+            'description': description,
+            'url': f"https://news{rng.randrange(8)}.example.com/{stream}/{i}?utm_source=bench",
+            'published': published,
+        }
+
+    def rss(self, feed, n_items):
+        items = []
+        for i in range(n_items):
+            article = self.article(f"feed{feed}", i)
+            items.append(
+                "<item>"
+                f"<title>{escape(article['title'])}</title>"
+                f"<link>{escape(article['url'])}</link>"
+                f"<pubDate>{format_datetime(article['published'])}</pubDate>"
+                f"<description>{escape(article['description'])}</description>"
+                "</item>"
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            f'<rss version="2.0"><channel><title>Benchmark feed {feed}</title>'
+            + ''.join(items)
+            + '</channel></rss>'
+        ).encode('utf-8')
+
+    def everything(self, day_from, day_to, page, page_size, per_day):
+        """
+        Returns a NewsAPI /v2/everything response body for a date range.
+        """
+        start = datetime.strptime(day_from, '%Y-%m-%d').date()
+        end = datetime.strptime(day_to, '%Y-%m-%d').date()
+        days = [start + timedelta(days=d) for d in range((end - start).days + 1)]
+        total = per_day * len(days)
+        articles = []
+        for n in range((page - 1) * page_size, min(total, page * page_size)):
+            day = days[n // per_day]
+            article = self.article(day.isoformat(), n % per_day)
+            published = datetime.combine(day, article['published'].time(), tzinfo=timezone.utc)
+            articles.append({
+                'source': {'id': None, 'name': article['source']},
+                'author': 'Benchmark',
+                'title': article['title'],
+                'description': article['description'],
+                'url': article['url'],
+                'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'content': article['description'],
+            })
+        return {'status': 'ok', 'totalResults': total, 'articles': articles}
+
+
+def make_handler(corpus, items, latency, error_rate, seed=0):
+    """
+    Builds the request handler class. `latency` is in seconds; a share
+    `error_rate` of requests answer 503 to exercise the retry path.
+    """
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    feeds = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def send_body(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            with rng_lock:
+                failed = rng.random() < error_rate
+            if failed:
+                self.send_body(503, 'text/plain', b'Service Unavailable')
+                return
+
+            url = urlsplit(self.path)
+            if url.path.startswith('/feeds/') and url.path.endswith('.xml'):
+                feed = url.path[len('/feeds/'):-len('.xml')]
+                if feed not in feeds:
+                    feeds[feed] = corpus.rss(feed, items)
+                self.send_body(200, 'application/rss+xml', feeds[feed])
+            elif url.path == '/v2/everything':
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                data = corpus.everything(query['from'], query['to'], int(query.get('page', 1)),
+                                         int(query.get('pageSize', 100)), items)
+                self.send_body(200, 'application/json', json.dumps(data).encode('utf-8'))
+            else:
+                self.send_body(404, 'text/plain', b'Not Found')
+
+    return Handler
+
+
+def start_server(port=0, items=200, latency=0.0, error_rate=0.0, keyword="India", seed=0):
+    """
+    Starts the server on a daemon thread. Returns (server, base_url);
+    call server.shutdown() when done. Port 0 picks a free port.
+    """
+    corpus = Corpus(keyword=keyword, seed=seed)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(corpus, items, latency, error_rate, seed))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def feed_urls(base_url, n_feeds):
+    """
+    NEWS_SOURCES-style mapping of `n_feeds` benchmark feeds.
+    """
+    return {f"Benchmark {n}": f"{base_url}/feeds/{n}.xml" for n in range(n_feeds)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--feeds', type=int, default=20, help="feeds listed at startup")
+    parser.add_argument('--items', type=int, default=200, help="items per feed / NewsAPI articles per day")
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--keyword', default="India", help="topic keyword placed in most titles")
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.items, args.latency_ms / 1000,
+                                    args.error_rate, args.keyword)
+    print(f"Serving on {base_url} (NewsAPI: {base_url}/v2/everything)")
+    for name, url in feed_urls(base_url, args.feeds).items():
+        print(f"  {name}: {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
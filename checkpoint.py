@@ -0,0 +1,165 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
+import config
+from article import Article, to_json
+from atomic import write_atomic
+
+# Defaults used when config.py does not override them
+DEFAULT_RUN_DIR = "run"
+DEFAULT_RUN_MAX_AGE_HOURS = 12
+DEFAULT_RUN_CHECKPOINT_TEXTS = 200  # Scored texts per checkpoint write
+
+RUN_FILE = "run.json"
+PAGES_DIR = "pages"
+FEEDS_DIR = "feeds"
+SCORES_FILE = "scores.jsonl"
+
+# The run in progress, if any (see start())
+_current = None
+
+
+def _name_key(*parts):
+    return hashlib.blake2b(json.dumps(parts).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _write_json(path, data):
+    write_atomic(path, lambda f: json.dump(data, f, ensure_ascii=False, default=to_json))
+
+
+def _read_json(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+class RunCheckpoint:
+    """
+    Work units of one collection run, saved to RUN_DIR as each completes:
+    NewsAPI pages (pages/, keyed by query, window and page number), parsed
+    RSS feeds (feeds/, keyed by source and URL) and sentiment scores
+    (scores.jsonl, appended every RUN_CHECKPOINT_TEXTS texts).
+
+    A run that dies leaves them behind; the next run of the same job
+    picks them up instead of fetching the pages again (and spending
+    NewsAPI quota on them) or scoring the texts again. The directory is
+    removed once the run's articles are committed to the store.
+    """
+
+    def __init__(self, path, job):
+        self.path = path
+        self.job = job
+        self._scores = None
+
+    def _file(self, *parts):
+        return os.path.join(self.path, *parts)
+
+    def load_page(self, params, window, page):
+        """
+        Returns the saved NewsAPI response for `page` of `window` with the
+        query `params` (apiKey excluded), or None.
+        """
+        return _read_json(self._file(PAGES_DIR, f"{window[0]}_{window[1]}_{page:03d}_{_name_key(params)}.json"))
+
+    def save_page(self, params, window, page, data):
+        _write_json(self._file(PAGES_DIR, f"{window[0]}_{window[1]}_{page:03d}_{_name_key(params)}.json"), data)
+
+    def load_feed(self, source_name, url):
+        """
+        Returns the saved parsed articles of a feed (as Article records), or None.
+        """
+        data = _read_json(self._file(FEEDS_DIR, f"{_name_key(source_name, url)}.json"))
+        if data is None:
+            return None
+        return [Article.from_dict(article) for article in data]
+
+    def save_feed(self, source_name, url, articles):
+        _write_json(self._file(FEEDS_DIR, f"{_name_key(source_name, url)}.json"), articles)
+
+    def scores(self):
+        """
+        Returns the saved sentiment scores as {text key: (polarity, subjectivity)}.
+        A line cut short by a crash is ignored.
+        """
+        if self._scores is None:
+            self._scores = {}
+            path = self._file(SCORES_FILE)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            key, polarity, subjectivity = json.loads(line)
+                        except ValueError:
+                            break
+                        self._scores[key] = (polarity, subjectivity)
+        return self._scores
+
+    def save_scores(self, scored):
+        """
+        Appends (text key, (polarity, subjectivity)) pairs to the scores file.
+        """
+        with open(self._file(SCORES_FILE), 'a', encoding='utf-8') as f:
+            for key, (polarity, subjectivity) in scored:
+                f.write(json.dumps([key, polarity, subjectivity]))
+                f.write('\n')
+                self.scores()[key] = (polarity, subjectivity)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def summary(self):
+        pages = len(os.listdir(self._file(PAGES_DIR)))
+        feeds = len(os.listdir(self._file(FEEDS_DIR)))
+        return f"{pages} NewsAPI page(s), {feeds} feed(s), {len(self.scores())} scored text(s)"
+
+
+def start(job):
+    """
+    Starts checkpointing a run of `job` in RUN_DIR and returns its
+    RunCheckpoint. The checkpoints of an unfinished run of the same job,
+    started less than RUN_MAX_AGE_HOURS ago, are resumed; older or other
+    leftovers are discarded.
+    """
+    global _current
+    path = getattr(config, 'RUN_DIR', DEFAULT_RUN_DIR)
+    max_age = getattr(config, 'RUN_MAX_AGE_HOURS', DEFAULT_RUN_MAX_AGE_HOURS) * 3600
+    run = _read_json(os.path.join(path, RUN_FILE))
+    if run is not None and run.get('job') == job and time.time() - run.get('started', 0) < max_age:
+        _current = RunCheckpoint(path, job)
+        logging.info(f"Resuming the unfinished {job} run in {path}: {_current.summary()} checkpointed")
+        return _current
+
+    if os.path.exists(path):
+        logging.info(f"Discarding the checkpoints in {path}")
+        shutil.rmtree(path)
+    os.makedirs(os.path.join(path, PAGES_DIR))
+    os.makedirs(os.path.join(path, FEEDS_DIR))
+    _write_json(os.path.join(path, RUN_FILE), {'job': job, 'started': time.time()})
+    _current = RunCheckpoint(path, job)
+    return _current
+
+
+def current():
+    """
+    Returns the RunCheckpoint of the run in progress, or None when nothing
+    is being checkpointed (e.g. a one-off scrape).
+    """
+    return _current
+
+
+def finish():
+    """
+    Ends the run in progress and removes its checkpoints.
+    """
+    global _current
+    if _current is not None:
+        shutil.rmtree(_current.path, ignore_errors=True)
+        _current = None
@@ -0,0 +1,163 @@
+"""
+Single entry point for the news scraper.
+
+    python cli.py scrape              One-time scrape into OUTPUT_FILE
+    python cli.py collect             Daily collection into the historical store
+    python cli.py daemon [--once]     Poll RSS feeds on adaptive schedules
+    python cli.py dashboard           Generate dashboard.html
+    python cli.py stats               Print statistics of the historical store
+    python cli.py search QUERY        Search titles and descriptions of the store
+    python cli.py trend               Sentiment per day/week/month from the rollups
+    python cli.py columns FILE        Export the store's column files (.csv or .npz)
+    python cli.py import FILE         Import a JSON array archive into the store
+    python cli.py export FILE         Export the store as one JSON array
+
+Each command imports only the modules it needs: 'dashboard', 'stats',
+'search' and 'trend' never load requests, lxml, BeautifulSoup or TextBlob/NLTK.
+"""
+import argparse
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+
+
+def _setup_logging():
+    # No-op when the command's module already configured logging
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def cmd_scrape(args):
+    import scrapper
+    scrapper.main()
+
+
+def cmd_collect(args):
+    import daily_scraper
+    daily_scraper.run_daily_collection()
+
+
+def cmd_daemon(args):
+    import scheduler
+    _setup_logging()
+    scheduler.run_daemon(once=args.once)
+
+
+def cmd_dashboard(args):
+    import dashboard
+    dashboard.main()
+
+
+def cmd_stats(args):
+    from aggregates import load_store_stats, log_statistics
+    from storage import ArticleStore
+    _setup_logging()
+    store = ArticleStore()
+    log_statistics(load_store_stats(store))
+
+
+def cmd_search(args):
+    from search_index import open_search_index
+    from storage import ArticleStore
+    _setup_logging()
+    index = open_search_index(ArticleStore())
+    if index is None:
+        print("Search needs SQLite with FTS5, which this Python lacks")
+        return
+    until = args.until + timedelta(days=1, seconds=-1) if args.until else None
+    results = index.search(args.query, source=args.source, start=args.since, end=until,
+                           label=args.label, limit=args.limit)
+    for result in results:
+        print(f"{result['pubDate'] or '-'}  [{result['source']}] {result['title']}"
+              f"  ({result['label'] or '-'})\n    {result['link']}")
+    if not results:
+        print("No matching articles")
+
+
+def cmd_trend(args):
+    from rollups import ALL_TOPICS, open_rollups
+    from storage import ArticleStore
+    _setup_logging()
+    rollups = open_rollups(ArticleStore())
+    until = args.until + timedelta(days=1, seconds=-1) if args.until else None
+    points = rollups.trend(args.period, source=args.source, topic=args.topic or ALL_TOPICS,
+                           start=args.since, end=until)
+    print(f"{args.period:<10} {'articles':>8} {'polarity':>9} {'stddev':>7} "
+          f"{'positive':>8} {'negative':>8} {'neutral':>8}")
+    for point in points:
+        print(f"{point['bucket']:<10} {point['count']:>8} {point['avg_polarity']:>9.3f} "
+              f"{point['polarity_stddev']:>7.3f} {point['positive']:>8} {point['negative']:>8} "
+              f"{point['neutral']:>8}")
+    if not points:
+        print("No articles in this range")
+
+
+def _day(value):
+    return datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+
+
+def cmd_columns(args):
+    from columns import export_columns
+    from storage import ArticleStore
+    _setup_logging()
+    export_columns(ArticleStore(), args.file)
+
+
+def cmd_import(args):
+    from storage import ArticleStore
+    _setup_logging()
+    ArticleStore().import_json(args.file)
+
+
+def cmd_export(args):
+    from storage import ArticleStore
+    _setup_logging()
+    ArticleStore().export_json(args.file)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="News scraper with sentiment analysis",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('\n\n')[1],
+    )
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    commands.required = True
+
+    commands.add_parser('scrape', help="one-time scrape into OUTPUT_FILE").set_defaults(func=cmd_scrape)
+    commands.add_parser('collect', help="daily collection into the historical store").set_defaults(func=cmd_collect)
+    daemon = commands.add_parser('daemon', help="poll RSS feeds on adaptive schedules")
+    daemon.add_argument('--once', action='store_true', help="poll the feeds that are due, then exit")
+    daemon.set_defaults(func=cmd_daemon)
+    commands.add_parser('dashboard', help="generate dashboard.html").set_defaults(func=cmd_dashboard)
+    commands.add_parser('stats', help="print statistics of the historical store").set_defaults(func=cmd_stats)
+    search = commands.add_parser('search', help="search titles and descriptions of the store")
+    search.add_argument('query', help='words to match; "quoted phrase", prefix*')
+    search.add_argument('--source', help="only articles from this source")
+    search.add_argument('--label', choices=('positive', 'negative', 'neutral'), help="only this sentiment")
+    search.add_argument('--since', type=_day, metavar='YYYY-MM-DD', help="published on or after this day (UTC)")
+    search.add_argument('--until', type=_day, metavar='YYYY-MM-DD', help="published on or before this day (UTC)")
+    search.add_argument('--limit', type=int, default=20)
+    search.set_defaults(func=cmd_search)
+    trend = commands.add_parser('trend', help="sentiment per day/week/month from the rollups")
+    trend.add_argument('--period', choices=('day', 'week', 'month'), default='week')
+    trend.add_argument('--source', help="only articles from this source")
+    trend.add_argument('--topic', help="only articles tagged with this topic (see SEARCH_QUERY)")
+    trend.add_argument('--since', type=_day, metavar='YYYY-MM-DD', help="from the period containing this day")
+    trend.add_argument('--until', type=_day, metavar='YYYY-MM-DD', help="to the period containing this day")
+    trend.set_defaults(func=cmd_trend)
+    for name, func, text in (('columns', cmd_columns, "export the store's column files (.csv, or .npz with NumPy)"),
+                             ('import', cmd_import, "import a JSON array archive into the store"),
+                             ('export', cmd_export, "export the store as one JSON array")):
+        command = commands.add_parser(name, help=text)
+        command.add_argument('file')
+        command.set_defaults(func=func)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+import csv
+import json
+import logging
+import os
+import sys
+from array import array
+from collections import Counter
+
+from atomic import write_atomic
+from dates import article_timestamp, format_day
+
+COLUMNS_DIR = "columns"
+DICTIONARY_FILE = "strings.json"
+
+NO_TIMESTAMP = -(1 << 63)
+NO_CLUSTER = -1
+NO_LABEL = -1
+
+# Column files in HISTORY_DIR/columns/, one fixed-width little-endian value
+# per stored article, in store order, as array typecodes (NumPy dtypes are
+# derived from the item sizes). 'source' and 'label' hold indexes into the
+# string dictionaries of strings.json, which only ever grow.
+COLUMNS = {
+    'timestamp': 'q',
+    'source': 'i',
+    'polarity': 'd',
+    'subjectivity': 'd',
+    'label': 'b',
+    'cluster': 'q',
+}
+_DTYPES = {
+    name: ('<f' if code == 'd' else '<i') + str(array(code).itemsize)
+    for name, code in COLUMNS.items()
+}
+# Strings kept in the dictionary, by column
+DICTIONARY_COLUMNS = ('source', 'label')
+
+EXPORT_CHUNK_ROWS = 65536
+
+
+def column_path(root, name):
+    return os.path.join(root, COLUMNS_DIR, f"{name}.bin")
+
+
+def load_dictionary(root):
+    path = os.path.join(root, COLUMNS_DIR, DICTIONARY_FILE)
+    if not os.path.exists(path):
+        return {name: [] for name in DICTIONARY_COLUMNS}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def complete_rows(root):
+    """
+    Returns the number of rows that every column file holds in full, or 0
+    if a file or strings.json is missing (the IDs would mean nothing).
+    """
+    if not os.path.exists(os.path.join(root, COLUMNS_DIR, DICTIONARY_FILE)):
+        return 0
+    rows = []
+    for name, code in COLUMNS.items():
+        path = column_path(root, name)
+        if not os.path.exists(path):
+            return 0
+        rows.append(os.path.getsize(path) // array(code).itemsize)
+    return min(rows)
+
+
+def append_columns(root, articles, rows):
+    """
+    Writes the columns of `articles` after the first `rows` rows of the
+    column files (anything beyond them is left over from an interrupted
+    append and is overwritten). Called by the store before it commits the
+    segment holding the same articles. Raises ValueError if the files hold
+    fewer than `rows` rows, rather than padding them.
+    """
+    if rows and complete_rows(root) < rows:
+        raise ValueError(f"The column files of {root} hold fewer than {rows} rows")
+    directory = os.path.join(root, COLUMNS_DIR)
+    os.makedirs(directory, exist_ok=True)
+    dictionary = load_dictionary(root)
+    ids = {name: {value: i for i, value in enumerate(dictionary[name])} for name in DICTIONARY_COLUMNS}
+    grown = False
+
+    def string_id(name, value):
+        nonlocal grown
+        known = ids[name]
+        if value not in known:
+            known[value] = len(dictionary[name])
+            dictionary[name].append(value)
+            grown = True
+        return known[value]
+
+    values = {name: array(code) for name, code in COLUMNS.items()}
+    for article in articles:
+        sentiment = article.get('sentiment') or {}
+        ts = article_timestamp(article)
+        cluster = article.get('cluster_id')
+        label = sentiment.get('label')
+        values['timestamp'].append(NO_TIMESTAMP if ts is None else ts)
+        values['source'].append(string_id('source', article.get('source') or ''))
+        values['polarity'].append(sentiment.get('polarity', 0.0))
+        values['subjectivity'].append(sentiment.get('subjectivity', 0.0))
+        values['label'].append(NO_LABEL if label is None else string_id('label', label))
+        values['cluster'].append(NO_CLUSTER if cluster is None else cluster)
+
+    if grown:
+        write_atomic(os.path.join(directory, DICTIONARY_FILE), lambda f: json.dump(dictionary, f, ensure_ascii=False))
+
+    for name, column in values.items():
+        if sys.byteorder == 'big':
+            column.byteswap()
+        path = column_path(root, name)
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            f.truncate(rows * column.itemsize)
+            f.seek(rows * column.itemsize)
+            column.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _check_covered(store, total):
+    if complete_rows(store.root) < total:
+        raise ValueError(f"The column files of {store.root} do not cover the store (COLUMNS_ENABLED is off)")
+
+
+def iter_column_rows(store):
+    """
+    Yields (timestamp, source, polarity, subjectivity, label, cluster_id)
+    per stored article from the column files, decoding the dictionary
+    strings; unknown timestamps, labels and clusters are None. Reads the
+    files in chunks with the standard library only.
+    """
+    store.sync_columns()
+    total = len(store)
+    _check_covered(store, total)
+    dictionary = load_dictionary(store.root)
+    files = {name: open(column_path(store.root, name), 'rb') for name in COLUMNS} if total else {}
+    try:
+        for first in range(0, total, EXPORT_CHUNK_ROWS):
+            n = min(EXPORT_CHUNK_ROWS, total - first)
+            chunk = {}
+            for name, code in COLUMNS.items():
+                chunk[name] = array(code)
+                chunk[name].fromfile(files[name], n)
+                if sys.byteorder == 'big':
+                    chunk[name].byteswap()
+            for i in range(n):
+                ts = chunk['timestamp'][i]
+                label = chunk['label'][i]
+                cluster = chunk['cluster'][i]
+                yield (
+                    None if ts == NO_TIMESTAMP else ts,
+                    dictionary['source'][chunk['source'][i]],
+                    chunk['polarity'][i],
+                    chunk['subjectivity'][i],
+                    None if label == NO_LABEL else dictionary['label'][label],
+                    None if cluster == NO_CLUSTER else cluster,
+                )
+    finally:
+        for f in files.values():
+            f.close()
+
+
+class Columns:
+    """
+    NumPy arrays over the column files (read-only memory maps, or slices
+    of them) as attributes named like the columns (timestamp, source,
+    polarity, subjectivity, label, cluster), plus the string dictionaries.
+    Use load_columns() to get one.
+    """
+
+    def __init__(self, arrays, dictionary, segments):
+        self.arrays = arrays
+        self.dictionary = dictionary
+        # (first row, count, oldest, newest) of each store segment covered
+        self.segments = segments
+        for name, values in arrays.items():
+            setattr(self, name, values)
+
+    def __len__(self):
+        return len(self.arrays['timestamp'])
+
+    def source_id(self, source):
+        """
+        Returns the ID of `source` in the source column, or -1 if unknown.
+        """
+        try:
+            return self.dictionary['source'].index(source)
+        except ValueError:
+            return -1
+
+    def between(self, start=None, end=None):
+        """
+        Returns the articles published within [start, end] (aware
+        datetimes). Segments entirely outside the range are skipped using
+        the manifest's bounds; only the remaining rows are compared.
+        """
+        start_ts = int(start.timestamp()) if start else None
+        end_ts = int(end.timestamp()) if end else None
+        first, last = None, None
+        for row, count, oldest, newest in self.segments:
+            if newest is None:
+                continue
+            if start_ts is not None and newest < start_ts:
+                continue
+            if end_ts is not None and oldest > end_ts:
+                continue
+            first = row if first is None else first
+            last = row + count
+        if first is None:
+            return Columns({name: values[:0] for name, values in self.arrays.items()}, self.dictionary, [])
+
+        window = {name: values[first:last] for name, values in self.arrays.items()}
+        ts = window['timestamp']
+        mask = ts != NO_TIMESTAMP
+        if start_ts is not None:
+            mask &= ts >= start_ts
+        if end_ts is not None:
+            mask &= ts <= end_ts
+        if mask.all():
+            return Columns(window, self.dictionary, [])
+        return Columns({name: values[mask] for name, values in window.items()}, self.dictionary, [])
+
+    def polarity_bins(self):
+        """
+        Polarity histogram with the bins of aggregates.polarity_bin().
+        """
+        import numpy as np
+
+        bins, counts = np.unique(np.floor(self.polarity * 10 + 0.5) / 10, return_counts=True)
+        return Counter({f"{b:.1f}": int(n) for b, n in zip(bins.tolist(), counts.tolist())})
+
+    def running_stats(self):
+        """
+        Computes the RunningStats of these rows with vectorized scans
+        (float sums may differ from a row-by-row update in the last digits).
+        """
+        import numpy as np
+
+        from aggregates import RunningStats
+
+        stats = RunningStats()
+        stats.total = len(self)
+        if not stats.total:
+            return stats
+        sources = self.dictionary['source']
+        labels = self.dictionary['label']
+
+        source_counts = np.bincount(self.source, minlength=len(sources))
+        stats.sources = Counter({sources[i]: int(n) for i, n in enumerate(source_counts.tolist()) if n})
+        labelled = self.label != NO_LABEL
+        label_counts = np.bincount(self.label[labelled], minlength=len(labels))
+        stats.labels = Counter({labels[i]: int(n) for i, n in enumerate(label_counts.tolist()) if n})
+        pairs = np.bincount(self.source[labelled].astype(np.int64) * len(labels) + self.label[labelled],
+                            minlength=len(sources) * len(labels))
+        for i, n in enumerate(pairs.tolist()):
+            if n:
+                stats.source_labels.setdefault(sources[i // len(labels)], Counter())[labels[i % len(labels)]] = n
+
+        stats.polarity_sum = float(self.polarity.sum())
+        stats.polarity_sumsq = float(np.dot(self.polarity, self.polarity))
+        stats.subjectivity_sum = float(self.subjectivity.sum())
+        stats.polarity_bins = self.polarity_bins()
+
+        dated = self.timestamp != NO_TIMESTAMP
+        if dated.any():
+            ts = self.timestamp[dated]
+            days, inverse = np.unique(ts // 86400, return_inverse=True)
+            counts = np.bincount(inverse)
+            sums = np.bincount(inverse, weights=self.polarity[dated])
+            for day, n, total in zip(days.tolist(), counts.tolist(), sums.tolist()):
+                stats.day_counts[format_day(day * 86400)] = n
+                stats.day_polarity_sums[format_day(day * 86400)] = total
+            stats.oldest = int(ts.min())
+            stats.newest = int(ts.max())
+
+        clustered = self.cluster != NO_CLUSTER
+        clusters = np.unique(self.cluster[clustered])
+        stats.cluster_count = len(clusters)
+        stats.next_cluster = int(clusters[-1]) + 1 if len(clusters) else 0
+        stats.clustered = int(clustered.sum())
+        return stats
+
+
+def load_columns(store):
+    """
+    Maps the column files of `store` as read-only NumPy arrays (no copy,
+    no parsing). Brings the files up to date with the store first.
+    Raises ImportError if NumPy is not installed and ValueError if the
+    column files are turned off. For example:
+
+        cols = load_columns(ArticleStore())
+        recent = cols.between(start=datetime(2026, 7, 1, tzinfo=timezone.utc))
+        recent.polarity[recent.source == recent.source_id('BBC News')].mean()
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("Column scans need NumPy: pip install numpy") from None
+
+    store.sync_columns()
+    total = len(store)
+    _check_covered(store, total)
+    arrays = {}
+    for name in COLUMNS:
+        if total:
+            arrays[name] = np.memmap(column_path(store.root, name), dtype=_DTYPES[name], mode='r', shape=(total,))
+        else:
+            arrays[name] = np.empty(0, dtype=_DTYPES[name])
+    segments = []
+    row = 0
+    for segment in store.manifest['segments']:
+        segments.append((row, segment['count'], segment['oldest'], segment['newest']))
+        row += segment['count']
+    return Columns(arrays, load_dictionary(store.root), segments)
+
+
+def export_columns(store, path):
+    """
+    Exports the columns for external tools: a .npz archive (NumPy arrays,
+    with 'source_names' and 'label_names' for the IDs) or, for any other
+    extension, CSV with the strings decoded. Returns the number of rows.
+    """
+    if path.endswith('.npz'):
+        columns = load_columns(store)
+        import numpy as np
+
+        np.savez(
+            path,
+            source_names=np.array(columns.dictionary['source'], dtype=str),
+            label_names=np.array(columns.dictionary['label'], dtype=str),
+            **columns.arrays,
+        )
+        rows = len(columns)
+    else:
+        rows = 0
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['timestamp', 'source', 'polarity', 'subjectivity', 'label', 'cluster_id'])
+            for row in iter_column_rows(store):
+                writer.writerow(row)
+                rows += 1
+    logging.info(f"Exported {rows} rows of columns to {path}")
+    return rows
@@ -2,7 +2,16 @@ import json
 import os
 from datetime import datetime
 import logging
+import checkpoint
 import config
+import metrics
+from article import to_json
+from aggregates import load_store_stats, log_statistics, save_store_stats
+from feed_cache import open_feed_cache
+from near_dup import load_store_index, save_store_index
+from rollups import open_rollups
+from search_index import open_search_index
+from storage import ArticleStore
 from scrapper import scrape_with_newsapi, scrape_news_sources
 
 # Set up logging
@@ -15,170 +24,117 @@ logging.basicConfig(
     ]
 )
 
-# Historical data file
+# Legacy single-file historical archive, imported into the store on first run
 HISTORICAL_FILE = "articles_historical.json"
 
-def load_historical_data():
+def open_store():
     """
-    Load existing historical data if it exists.
+    Opens the append-only historical store, importing the legacy JSON archive
+    once, and loads its running statistics, near-duplicate index, search
+    index and sentiment rollups. Returns (store, running_stats,
+    near_dup_index, search_index, rollups); the last three are None when
+    NEAR_DUP_ENABLED / SEARCH_ENABLED / ROLLUPS_ENABLED are off.
     """
-    if os.path.exists(HISTORICAL_FILE):
-        try:
-            with open(HISTORICAL_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                logging.info(f"Loaded {len(data)} existing articles from historical data")
-                return data
-        except Exception as e:
-            logging.error(f"Error loading historical data: {e}")
-            return []
-    else:
-        logging.info("No historical data file found. Starting fresh.")
-        return []
+    store = ArticleStore()
+    if not len(store) and os.path.exists(HISTORICAL_FILE):
+        logging.info(f"Importing {HISTORICAL_FILE} into {store.root}...")
+        store.import_json(HISTORICAL_FILE)
+    logging.info(f"Loaded {len(store)} existing articles from {store.root}")
+    running_stats = load_store_stats(store)
+    near_dup_index = load_store_index(store) if getattr(config, 'NEAR_DUP_ENABLED', True) else None
+    search_index = open_search_index(store) if getattr(config, 'SEARCH_ENABLED', True) else None
+    rollups = open_rollups(store) if getattr(config, 'ROLLUPS_ENABLED', True) else None
+    return store, running_stats, near_dup_index, search_index, rollups
 
-def save_historical_data(articles):
+def commit_articles(store, running_stats, near_dup_index, search_index, rollups, new_articles):
     """
-    Save articles to historical data file.
+    Clusters, appends and commits the articles not stored yet, then brings
+    the running statistics, near-duplicate index, search index and
+    rollups up to date.
+    Returns the list of articles added.
     """
-    try:
-        with open(HISTORICAL_FILE, 'w', encoding='utf-8') as f:
-            json.dump(articles, f, indent=4)
-        logging.info(f"Saved {len(articles)} articles to {HISTORICAL_FILE}")
-    except Exception as e:
-        logging.error(f"Error saving historical data: {e}")
-
-def merge_articles(existing_articles, new_articles):
-    """
-    Merge new articles with existing ones, avoiding duplicates.
-    """
-    # Create a set of existing article links for fast lookup
-    existing_links = {article['link'] for article in existing_articles}
-    
-    # Count duplicates
-    duplicates = 0
-    new_count = 0
-    
-    # Add only new articles
-    for article in new_articles:
-        if article['link'] not in existing_links:
-            existing_articles.append(article)
-            existing_links.add(article['link'])
-            new_count += 1
-        else:
-            duplicates += 1
-    
-    logging.info(f"Added {new_count} new articles, skipped {duplicates} duplicates")
-    return existing_articles
-
-def sort_articles_by_date(articles):
-    """
-    Sort articles by publication date (newest first).
-    """
-    def get_date(article):
-        try:
-            pub_date = article.get('pubDate', '')
-            if pub_date:
-                # Handle both formats
-                if 'T' in pub_date:  # ISO format from NewsAPI
-                    return datetime.fromisoformat(pub_date.replace('Z', '+00:00'))
-                else:  # RSS format
-                    from email.utils import parsedate_to_datetime
-                    return parsedate_to_datetime(pub_date)
-        except:
-            return datetime.min
-        return datetime.min
-    
-    return sorted(articles, key=get_date, reverse=True)
-
-def get_statistics(articles):
-    """
-    Get statistics about the historical data.
-    """
-    if not articles:
-        return {}
-    
-    from collections import Counter
-    
-    # Date range
-    dates = []
-    for article in articles:
-        try:
-            pub_date = article.get('pubDate', '')
-            if pub_date:
-                if 'T' in pub_date:
-                    date_obj = datetime.fromisoformat(pub_date.replace('Z', '+00:00'))
-                else:
-                    from email.utils import parsedate_to_datetime
-                    date_obj = parsedate_to_datetime(pub_date)
-                dates.append(date_obj)
-        except:
-            pass
-    
-    stats = {
-        'total_articles': len(articles),
-        'sources': len(set(article['source'] for article in articles)),
-        'oldest_article': min(dates).strftime('%Y-%m-%d') if dates else 'N/A',
-        'newest_article': max(dates).strftime('%Y-%m-%d') if dates else 'N/A',
-        'sentiment_distribution': Counter(article['sentiment']['label'] for article in articles),
-        'top_sources': Counter(article['source'] for article in articles).most_common(5)
-    }
-    
-    return stats
+    # Group the articles about to be stored into near-duplicate stories
+    if near_dup_index is not None:
+        with metrics.span('near_dup') as span:
+            fresh = store.unseen(new_articles)
+            span.add(articles=len(fresh), stories=near_dup_index.assign_articles(fresh))
+    
+    # Append only the articles not already stored (atomic commit)
+    with metrics.span('merge', articles=len(new_articles)) as span:
+        added = store.append(new_articles)
+        span.add(added=len(added), duplicates=len(new_articles) - len(added))
+    
+    # Seal the months that are over into compressed partitions
+    with metrics.span('compact') as span:
+        span.add(partitions=store.compact())
+    
+    with metrics.span('save'):
+        if added and near_dup_index is not None:
+            save_store_index(store, near_dup_index)
+        
+        # Index only the additions for search and fold them into the rollups
+        if added and search_index is not None:
+            search_index.add(added, len(store))
+        if added and rollups is not None:
+            rollups.add(added, len(store))
+        
+        # Fold only the additions into the running statistics
+        running_stats.update(added)
+        save_store_stats(store, running_stats)
+    return added
 
 def run_daily_collection():
     """
     Main function to run daily article collection.
     """
+    metrics.reset()
     logging.info("=" * 60)
     logging.info(f"Starting daily collection at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logging.info("=" * 60)
     
-    # Load existing historical data
-    historical_articles = load_historical_data()
-    initial_count = len(historical_articles)
+    store, running_stats, near_dup_index, search_index, rollups = open_store()
+    initial_count = len(store)
+    
+    # Save fetched pages / feeds and sentiment scores as they complete, so a
+    # run that dies is resumed from them instead of starting over
+    checkpoint.start('newsapi' if config.USE_NEWS_API else 'rss')
     
-    # Fetch new articles
+    # Fetch new articles; feed validators are saved only once the store
+    # holds the articles they vouch for
     logging.info("\nFetching new articles...")
+    feed_cache = None
     if config.USE_NEWS_API:
         new_articles = scrape_with_newsapi()
     else:
-        new_articles = scrape_news_sources()
+        feed_cache = open_feed_cache()
+        new_articles = scrape_news_sources(feed_cache)
     
     if not new_articles:
         logging.warning("No new articles fetched!")
+        if feed_cache:
+            feed_cache.save()
+        checkpoint.finish()
+        metrics.write_run_metrics('collection')
         return
     
-    # Merge with historical data
     logging.info("\nMerging with historical data...")
-    historical_articles = merge_articles(historical_articles, new_articles)
-    
-    # Sort by date
-    historical_articles = sort_articles_by_date(historical_articles)
-    
-    # Save updated historical data
-    save_historical_data(historical_articles)
+    commit_articles(store, running_stats, near_dup_index, search_index, rollups, new_articles)
+    if feed_cache:
+        feed_cache.save()
+    checkpoint.finish()
     
     # Save today's articles separately
     today_file = f"articles_daily_{datetime.now().strftime('%Y%m%d')}.json"
-    with open(today_file, 'w', encoding='utf-8') as f:
-        json.dump(new_articles, f, indent=4)
+    with metrics.span('save') as span, open(today_file, 'w', encoding='utf-8') as f:
+        json.dump(new_articles, f, indent=4, default=to_json)
+        span.add(articles=len(new_articles), bytes=f.tell())
     logging.info(f"Saved today's {len(new_articles)} articles to {today_file}")
     
     # Display statistics
-    logging.info("\n" + "=" * 60)
-    logging.info("COLLECTION STATISTICS")
-    logging.info("=" * 60)
-    stats = get_statistics(historical_articles)
+    log_statistics(running_stats, added_today=len(store) - initial_count)
     
-    logging.info(f"Total articles in database: {stats['total_articles']}")
-    logging.info(f"New articles added today: {stats['total_articles'] - initial_count}")
-    logging.info(f"Number of sources: {stats['sources']}")
-    logging.info(f"Date range: {stats['oldest_article']} to {stats['newest_article']}")
-    logging.info(f"\nSentiment distribution:")
-    for sentiment, count in stats['sentiment_distribution'].items():
-        logging.info(f"  {sentiment.capitalize()}: {count}")
-    logging.info(f"\nTop 5 sources:")
-    for source, count in stats['top_sources']:
-        logging.info(f"  {source}: {count} articles")
+    metrics.log_summary()
+    metrics.write_run_metrics('collection')
     
     logging.info("\n" + "=" * 60)
     logging.info("Daily collection completed successfully!")
@@ -1,66 +1,42 @@
+import html
 import json
+import os
+from datetime import datetime, timezone
 import config
-from collections import Counter
 import logging
+import metrics
+from aggregates import RunningStats, load_store_stats
+from article import Article
+from atomic import write_atomic
+from dates import article_timestamp, format_day
+from json_stream import iter_json_array
+from rollups import open_rollups
+from storage import ArticleStore
+from topics import describe_query
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def generate_dashboard():
-    """
-    Generates an interactive HTML dashboard with news statistics and sentiment analysis.
-    """
-    try:
-        with open(config.OUTPUT_FILE, 'r') as f:
-            articles = json.load(f)
-    except FileNotFoundError:
-        logging.error(f"File {config.OUTPUT_FILE} not found. Please run scrapper.py first.")
-        return
-    
-    if not articles:
-        logging.warning("No articles found in the file.")
-        return
-    
-    # Analyze data
-    total_articles = len(articles)
-    
-    # Count by source
-    source_counts = Counter(article['source'] for article in articles)
-    
-    # Count by sentiment
-    sentiment_counts = Counter(article['sentiment']['label'] for article in articles)
-    
-    # Calculate average sentiment scores
-    avg_polarity = sum(article['sentiment']['polarity'] for article in articles) / total_articles
-    avg_subjectivity = sum(article['sentiment']['subjectivity'] for article in articles) / total_articles
-    
-    # Get top sources
-    top_sources = source_counts.most_common(10)
-    
-    # Prepare data for charts
-    source_names = [source for source, _ in top_sources]
-    source_values = [count for _, count in top_sources]
-    
-    sentiment_labels = list(sentiment_counts.keys())
-    sentiment_values = list(sentiment_counts.values())
-    
-    # Sentiment distribution by source
-    source_sentiment = {}
-    for article in articles:
-        source = article['source']
-        sentiment = article['sentiment']['label']
-        if source not in source_sentiment:
-            source_sentiment[source] = {'positive': 0, 'negative': 0, 'neutral': 0}
-        source_sentiment[source][sentiment] += 1
-    
-    # Generate HTML Dashboard
-    html_content = f"""
-<!DOCTYPE html>
+# Number of rows in the "Recent Articles" table
+RECENT_ARTICLES = 20
+
+# Weekly polarity trend chart: weeks shown and sources charted besides the total
+TREND_WEEKS = 26
+TREND_SOURCES = 5
+
+# Defaults used when config.py does not override them
+DEFAULT_DASHBOARD_DATA_DIR = "dashboard_data"
+DEFAULT_DASHBOARD_SHARD_SIZE = 500
+
+# Month key of the archive shards holding undated articles
+UNDATED_MONTH = "0000-00"
+
+PAGE_HEAD = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>News Sentiment Dashboard - {config.SEARCH_QUERY}</title>
+    <title>News Sentiment Dashboard - {query}</title>
     <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
     <style>
         * {{
@@ -217,6 +193,31 @@ def generate_dashboard():
             text-decoration: underline;
         }}
         
+        .archive-filters {{
+            display: flex;
+            flex-wrap: wrap;
+            gap: 10px;
+            margin-bottom: 20px;
+        }}
+        
+        .archive-filters input, .archive-filters select {{
+            padding: 8px 12px;
+            border: 1px solid #ddd;
+            border-radius: 8px;
+            font-size: 1em;
+        }}
+        
+        .archive-scroll {{
+            max-height: 600px;
+            overflow-y: auto;
+        }}
+        
+        .archive-status {{
+            color: #666;
+            text-align: center;
+            padding: 15px;
+        }}
+        
         footer {{
             text-align: center;
             color: white;
@@ -229,7 +230,7 @@ def generate_dashboard():
     <div class="container">
         <header>
             <h1>📰 News Sentiment Dashboard</h1>
-            <p class="subtitle">Analysis of "{config.SEARCH_QUERY}" articles</p>
+            <p class="subtitle">Analysis of "{query}" articles</p>
         </header>
         
         <div class="stats-grid">
@@ -237,9 +238,13 @@ def generate_dashboard():
                 <div class="stat-label">Total Articles</div>
                 <div class="stat-number">{total_articles}</div>
             </div>
+            <div class="stat-card">
+                <div class="stat-label">Unique Stories</div>
+                <div class="stat-number">{total_stories}</div>
+            </div>
             <div class="stat-card">
                 <div class="stat-label">News Sources</div>
-                <div class="stat-number">{len(source_counts)}</div>
+                <div class="stat-number">{total_sources}</div>
             </div>
             <div class="stat-card">
                 <div class="stat-label">Avg Polarity</div>
@@ -274,6 +279,13 @@ def generate_dashboard():
             </div>
         </div>
         
+        <div class="chart-container">
+            <h3 class="chart-title">Articles and Average Polarity per Day</h3>
+            <div class="chart-wrapper">
+                <canvas id="timelineChart"></canvas>
+            </div>
+        </div>
+        
         <div class="articles-table">
             <h3 class="chart-title">Recent Articles</h3>
             <table>
@@ -288,43 +300,220 @@ def generate_dashboard():
                 </thead>
                 <tbody>
 """
-    
-    # Add article rows (first 20)
-    for article in articles[:20]:
-        sentiment_class = f"sentiment-{article['sentiment']['label']}"
-        pub_date = article.get('pubDate', 'N/A')[:10]  # Just the date part
-        
-        html_content += f"""
-                    <tr>
-                        <td>{article['source']}</td>
-                        <td><a href="{article['link']}" target="_blank" class="article-link">{article['title'][:100]}...</a></td>
+
+ARTICLE_ROW = """                    <tr>
+                        <td>{source}</td>
+                        <td><a href="{link}" target="_blank" class="article-link">{title}...</a></td>
                         <td>{pub_date}</td>
-                        <td class="{sentiment_class}">{article['sentiment']['label'].upper()}</td>
-                        <td>{article['sentiment']['polarity']:.3f}</td>
+                        <td class="sentiment-{label}">{label_upper}</td>
+                        <td>{polarity:.3f}</td>
                     </tr>
 """
-    
-    html_content += f"""
-                </tbody>
+
+TABLE_END = """                </tbody>
             </table>
         </div>
-        
+"""
+
+# Weekly polarity trend per source, read from the store's rollups
+TREND_SECTION = """        
+        <div class="chart-container" style="margin-top: 30px;">
+            <h3 class="chart-title">Average Polarity per Week by Source</h3>
+            <div class="chart-wrapper">
+                <canvas id="trendChart"></canvas>
+            </div>
+        </div>
+    <script id="trend-data" type="application/json">{trend}</script>
+    <script>
+        (function() {{
+            const trend = JSON.parse(document.getElementById('trend-data').textContent);
+            const colors = ['#667eea', '#ef4444', '#10b981', '#f59e0b', '#8b5cf6', '#06b6d4'];
+            new Chart(document.getElementById('trendChart').getContext('2d'), {{
+                type: 'line',
+                data: {{
+                    labels: trend.buckets,
+                    datasets: trend.series.map((series, i) => ({{
+                        label: series.label,
+                        data: series.values,
+                        borderColor: colors[i % colors.length],
+                        backgroundColor: colors[i % colors.length],
+                        borderWidth: i === 0 ? 3 : 1.5,
+                        spanGaps: true
+                    }}))
+                }},
+                options: {{
+                    responsive: true,
+                    maintainAspectRatio: false
+                }}
+            }});
+        }})();
+    </script>
+"""
+
+# Archive browser: rows come from the JSON shards written next to the page,
+# fetched newest shard first and only while the user scrolls or filters
+ARCHIVE_SECTION = """        
+        <div class="articles-table" style="margin-top: 30px;">
+            <h3 class="chart-title">Article Archive ({archive_total} articles)</h3>
+            <div class="archive-filters">
+                <input type="search" id="archiveText" placeholder="Search titles...">
+                <select id="archiveSource"><option value="">All sources</option></select>
+                <select id="archiveSentiment">
+                    <option value="">All sentiment</option>
+                    <option value="positive">Positive</option>
+                    <option value="negative">Negative</option>
+                    <option value="neutral">Neutral</option>
+                </select>
+                <input type="date" id="archiveFrom">
+                <input type="date" id="archiveTo">
+            </div>
+            <div class="archive-scroll" id="archiveScroll">
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Source</th>
+                            <th>Title</th>
+                            <th>Date</th>
+                            <th>Sentiment</th>
+                            <th>Polarity</th>
+                        </tr>
+                    </thead>
+                    <tbody id="archiveRows"></tbody>
+                </table>
+                <div class="archive-status" id="archiveStatus">Loading...</div>
+            </div>
+        </div>
+    <script>
+        (function() {{
+            const base = {data_dir};
+            const PAGE_ROWS = 50;
+            let manifest = null;
+            let nextShard = -1;
+            let pending = [];
+            let loading = false;
+            let generation = 0;
+            
+            const el = id => document.getElementById(id);
+            const text = value => {{
+                const node = document.createElement('span');
+                node.textContent = value;
+                return node.innerHTML;
+            }};
+            
+            function filters() {{
+                const from = el('archiveFrom').value;
+                const to = el('archiveTo').value;
+                return {{
+                    text: el('archiveText').value.trim().toLowerCase(),
+                    source: el('archiveSource').value,
+                    sentiment: el('archiveSentiment').value,
+                    from: from ? Date.parse(from + 'T00:00:00Z') / 1000 : null,
+                    to: to ? Date.parse(to + 'T23:59:59Z') / 1000 : null
+                }};
+            }}
+            
+            // Shards whose sources or date bounds cannot match are never fetched
+            function shardMatches(shard, f) {{
+                if (f.source && !shard.sources.includes(f.source)) return false;
+                if (f.from !== null && shard.newest !== null && shard.newest < f.from) return false;
+                if (f.to !== null && shard.oldest !== null && shard.oldest > f.to) return false;
+                return true;
+            }}
+            
+            function rowMatches(row, f) {{
+                const [ts, source, title, link, label] = row;
+                if (f.source && source !== f.source) return false;
+                if (f.sentiment && label !== f.sentiment) return false;
+                if (f.text && !title.toLowerCase().includes(f.text)) return false;
+                if (f.from !== null && (ts === null || ts < f.from)) return false;
+                if (f.to !== null && (ts === null || ts > f.to)) return false;
+                return true;
+            }}
+            
+            function render(rows) {{
+                const html = rows.map(([ts, source, title, link, label, polarity]) => `
+                    <tr>
+                        <td>${{text(source)}}</td>
+                        <td><a href="${{text(link)}}" target="_blank" class="article-link">${{text(title.slice(0, 100))}}...</a></td>
+                        <td>${{ts === null ? 'N/A' : new Date(ts * 1000).toISOString().slice(0, 10)}}</td>
+                        <td class="sentiment-${{label}}">${{label.toUpperCase()}}</td>
+                        <td>${{polarity.toFixed(3)}}</td>
+                    </tr>`).join('');
+                el('archiveRows').insertAdjacentHTML('beforeend', html);
+            }}
+            
+            async function loadMore() {{
+                if (loading || !manifest) return;
+                loading = true;
+                const run = generation;
+                const f = filters();
+                let shown = 0;
+                while (shown < PAGE_ROWS) {{
+                    if (!pending.length) {{
+                        while (nextShard >= 0 && !shardMatches(manifest.shards[nextShard], f)) nextShard--;
+                        if (nextShard < 0) break;
+                        const shard = manifest.shards[nextShard--];
+                        const rows = await (await fetch(base + '/' + shard.file)).json();
+                        if (run !== generation) {{ loading = false; return loadMore(); }}
+                        pending = rows.filter(row => rowMatches(row, f)).reverse();
+                    }}
+                    const batch = pending.splice(0, PAGE_ROWS - shown);
+                    render(batch);
+                    shown += batch.length;
+                }}
+                el('archiveStatus').textContent = (nextShard < 0 && !pending.length)
+                    ? (el('archiveRows').children.length ? 'End of archive' : 'No matching articles')
+                    : 'Scroll for more...';
+                loading = false;
+            }}
+            
+            function reset() {{
+                generation++;
+                nextShard = manifest.shards.length - 1;
+                pending = [];
+                el('archiveRows').innerHTML = '';
+                loadMore();
+            }}
+            
+            fetch(base + '/manifest.json').then(r => r.json()).then(m => {{
+                manifest = m;
+                for (const source of m.sources) {{
+                    el('archiveSource').insertAdjacentHTML('beforeend', `<option>${{text(source)}}</option>`);
+                }}
+                ['archiveText', 'archiveSource', 'archiveSentiment', 'archiveFrom', 'archiveTo']
+                    .forEach(id => el(id).addEventListener('change', reset));
+                el('archiveScroll').addEventListener('scroll', () => {{
+                    const box = el('archiveScroll');
+                    if (box.scrollTop + box.clientHeight > box.scrollHeight - 200) loadMore();
+                }});
+                reset();
+            }}).catch(() => {{
+                el('archiveStatus').textContent = 'Archive unavailable (serve this page over HTTP to browse it)';
+            }});
+        }})();
+    </script>
+"""
+
+PAGE_FOOT = """        
         <footer>
-            <p>Generated from {config.OUTPUT_FILE} | Total Articles Analyzed: {total_articles}</p>
-            <p>Search Query: "{config.SEARCH_QUERY}" | Date Range: Last {config.DATE_RANGE_YEARS} years</p>
+            <p>Generated from {data_label} | Total Articles Analyzed: {total_articles}</p>
+            <p>Search Query: "{query}" | Date Range: Last {date_range_years} years</p>
         </footer>
     </div>
     
+    <script id="dashboard-data" type="application/json">{payload}</script>
     <script>
+        const data = JSON.parse(document.getElementById('dashboard-data').textContent);
+        
         // Source Chart
         const sourceCtx = document.getElementById('sourceChart').getContext('2d');
         new Chart(sourceCtx, {{
             type: 'bar',
             data: {{
-                labels: {source_names},
+                labels: data.sources.labels,
                 datasets: [{{
                     label: 'Number of Articles',
-                    data: {source_values},
+                    data: data.sources.values,
                     backgroundColor: 'rgba(102, 126, 234, 0.7)',
                     borderColor: 'rgba(102, 126, 234, 1)',
                     borderWidth: 2
@@ -354,9 +543,9 @@ def generate_dashboard():
         new Chart(sentimentCtx, {{
             type: 'doughnut',
             data: {{
-                labels: {sentiment_labels},
+                labels: data.sentiment.labels,
                 datasets: [{{
-                    data: {sentiment_values},
+                    data: data.sentiment.values,
                     backgroundColor: [
                         'rgba(16, 185, 129, 0.7)',
                         'rgba(239, 68, 68, 0.7)',
@@ -381,27 +570,15 @@ def generate_dashboard():
             }}
         }});
         
-        // Polarity Distribution Chart
+        // Polarity Distribution Chart (bins computed when the page was generated)
         const polarityCtx = document.getElementById('polarityChart').getContext('2d');
-        const polarityData = {[article['sentiment']['polarity'] for article in articles]};
-        
-        // Create histogram bins
-        const bins = {{}};
-        polarityData.forEach(value => {{
-            const bin = Math.round(value * 10) / 10;
-            bins[bin] = (bins[bin] || 0) + 1;
-        }});
-        
-        const binLabels = Object.keys(bins).sort((a, b) => a - b);
-        const binValues = binLabels.map(label => bins[label]);
-        
         new Chart(polarityCtx, {{
             type: 'bar',
             data: {{
-                labels: binLabels,
+                labels: data.polarity.labels,
                 datasets: [{{
                     label: 'Article Count',
-                    data: binValues,
+                    data: data.polarity.values,
                     backgroundColor: 'rgba(118, 75, 162, 0.7)',
                     borderColor: 'rgba(118, 75, 162, 1)',
                     borderWidth: 2
@@ -431,20 +608,344 @@ def generate_dashboard():
                 }}
             }}
         }});
+        
+        // Timeline Chart
+        const timelineCtx = document.getElementById('timelineChart').getContext('2d');
+        new Chart(timelineCtx, {{
+            type: 'bar',
+            data: {{
+                labels: data.timeline.days,
+                datasets: [{{
+                    label: 'Articles',
+                    data: data.timeline.counts,
+                    backgroundColor: 'rgba(102, 126, 234, 0.7)',
+                    yAxisID: 'y'
+                }}, {{
+                    type: 'line',
+                    label: 'Avg Polarity',
+                    data: data.timeline.avg_polarity,
+                    borderColor: 'rgba(239, 68, 68, 1)',
+                    backgroundColor: 'rgba(239, 68, 68, 0.2)',
+                    yAxisID: 'polarity'
+                }}]
+            }},
+            options: {{
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {{
+                    y: {{
+                        beginAtZero: true,
+                        ticks: {{
+                            precision: 0
+                        }}
+                    }},
+                    polarity: {{
+                        position: 'right',
+                        min: -1,
+                        max: 1,
+                        grid: {{
+                            drawOnChartArea: false
+                        }}
+                    }}
+                }}
+            }}
+        }});
     </script>
 </body>
 </html>
 """
+
+
+def build_payload(stats):
+    """
+    Pre-aggregates everything the charts need into a compact dict.
+    Its size depends on the number of sources, bins and days, not articles.
+    """
+    top_sources = stats.sources.most_common(10)
+    bin_labels = sorted(stats.polarity_bins, key=float)
+    days = sorted(stats.day_counts)
+    return {
+        'stories': stats.stories,
+        'sources': {
+            'labels': [source for source, _ in top_sources],
+            'values': [count for _, count in top_sources],
+        },
+        'sentiment': {
+            'labels': list(stats.labels.keys()),
+            'values': list(stats.labels.values()),
+        },
+        'polarity': {
+            'labels': bin_labels,
+            'values': [stats.polarity_bins[label] for label in bin_labels],
+        },
+        'timeline': {
+            'days': days,
+            'counts': [stats.day_counts[day] for day in days],
+            'avg_polarity': [round(stats.day_polarity_sums[day] / stats.day_counts[day], 3) for day in days],
+        },
+    }
+
+
+def _json_for_script(payload):
+    """
+    Serializes the payload for an inline <script> block.
+    """
+    return json.dumps(payload, separators=(',', ':')).replace('</', '<\\/')
+
+
+def build_trend(rollups, newest, weeks=TREND_WEEKS, n_sources=TREND_SOURCES):
+    """
+    Weekly average polarity over the `weeks` weeks up to the `newest`
+    timestamp, for all sources and for the sources with the most articles
+    in that window. Reads a few hundred rollup rows at most.
+    Returns None when the window is empty.
+    """
+    start = datetime.fromtimestamp(newest - weeks * 7 * 86400, tz=timezone.utc)
+    total = rollups.trend('week', start=start)
+    if not total:
+        return None
+    buckets = [point['bucket'] for point in total]
+    series = [{'label': 'All sources', 'values': [round(point['avg_polarity'], 3) for point in total]}]
+    for source, _ in rollups.top_sources(n_sources, 'week', start=start):
+        by_bucket = {point['bucket']: point['avg_polarity'] for point in rollups.trend('week', source, start=start)}
+        series.append({
+            'label': source,
+            'values': [round(by_bucket[b], 3) if b in by_bucket else None for b in buckets],
+        })
+    return {'buckets': buckets, 'series': series}
+
+
+def write_dashboard(out, stats, recent_articles, data_label, archive_manifest=None, trend=None):
+    """
+    Streams the dashboard page to the file object `out`, section by section.
+    With an `archive_manifest` (see write_archive_shards) the page also gets
+    an archive browser that lazy-loads the shards, and with a `trend` (see
+    build_trend) a weekly polarity chart per source.
+    """
+    query = html.escape(describe_query())
+    out.write(PAGE_HEAD.format(
+        query=query,
+        total_articles=stats.total,
+        total_stories=stats.stories,
+        total_sources=len(stats.sources),
+        avg_polarity=stats.avg_polarity,
+        avg_subjectivity=stats.avg_subjectivity,
+    ))
     
-    # Save dashboard
+    for article in recent_articles:
+        sentiment = article['sentiment']
+        out.write(ARTICLE_ROW.format(
+            source=html.escape(article['source']),
+            link=html.escape(article['link'] or ''),
+            title=html.escape(article['title'][:100]),
+            pub_date=html.escape((article.get('pubDate') or 'N/A')[:10]),  # Just the date part
+            label=sentiment['label'],
+            label_upper=sentiment['label'].upper(),
+            polarity=sentiment['polarity'],
+        ))
+    
+    out.write(TABLE_END)
+    if trend is not None:
+        out.write(TREND_SECTION.format(trend=_json_for_script(trend)))
+    if archive_manifest is not None:
+        out.write(ARCHIVE_SECTION.format(
+            archive_total=archive_manifest['total'],
+            data_dir=_json_for_script(archive_manifest['data_dir']),
+        ))
+    
+    out.write(PAGE_FOOT.format(
+        data_label=html.escape(data_label),
+        total_articles=stats.total,
+        query=query,
+        date_range_years=config.DATE_RANGE_YEARS,
+        payload=_json_for_script(build_payload(stats)),
+    ))
+
+
+def _write_if_changed(path, content):
+    """
+    Writes `content` to `path` unless the file already holds exactly that,
+    so an unchanged manifest keeps its timestamp and produces no VCS diff.
+    """
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    write_atomic(path, lambda f: f.write(content))
+    return True
+
+
+def _shard_month(ts):
+    # Undated articles sort before every month, as they did by timestamp 0
+    return format_day(ts)[:7] if ts is not None else UNDATED_MONTH
+
+
+def _load_archive_manifest(data_dir, shard_size, store):
+    """
+    Returns the archive manifest in `data_dir` if later articles can be
+    added to it, or None if the shards must be rebuilt from the store.
+    """
+    path = os.path.join(data_dir, 'manifest.json')
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable archive manifest {path}: {e}")
+        return None
+    if manifest.get('shard_size') != shard_size or manifest.get('total', 0) > len(store):
+        return None
+    if any('month' not in shard for shard in manifest['shards']):  # Written by older versions
+        return None
+    if not all(os.path.exists(os.path.join(data_dir, shard['file'])) for shard in manifest['shards']):
+        return None
+    return manifest
+
+
+def write_archive_shards(store, data_dir=None, shard_size=None):
+    """
+    Writes the store's articles as JSON shards, one run of shards of at
+    most `shard_size` rows per publish month (oldest first, rows sorted by
+    publish time), plus a manifest with each shard's month, date bounds
+    and sources.
+
+    Each row is [pubTimestamp, source, title, link, label, polarity].
+    The manifest's 'total' counts the store articles the shards hold, so
+    a later call reads only the articles appended since (segment by
+    segment) and rewrites only the shards of the months they were
+    published in, usually just the current one. Without a usable manifest
+    the shards are rebuilt from the whole store. Returns the manifest dict.
+    """
+    data_dir = data_dir or getattr(config, 'DASHBOARD_DATA_DIR', DEFAULT_DASHBOARD_DATA_DIR)
+    shard_size = shard_size or getattr(config, 'DASHBOARD_SHARD_SIZE', DEFAULT_DASHBOARD_SHARD_SIZE)
+    os.makedirs(data_dir, exist_ok=True)
+    
+    manifest = _load_archive_manifest(data_dir, shard_size, store)
+    covered = manifest['total'] if manifest else 0
+    months = {}
+    for shard in manifest['shards'] if manifest else ():
+        months.setdefault(shard['month'], []).append(shard)
+    
+    new_rows = {}
+    for _, articles in store.iter_batches(covered):
+        for article in articles:
+            ts = article_timestamp(article)
+            row = [ts, article.source, article.title, article.link, article.label, article.polarity]
+            new_rows.setdefault(_shard_month(ts), []).append(row)
+    
+    for month, added in new_rows.items():
+        rows = []
+        for shard in months.get(month, ()):
+            with open(os.path.join(data_dir, shard['file']), 'r', encoding='utf-8') as f:
+                rows.extend(json.load(f))
+        rows.extend(added)
+        rows.sort(key=lambda row: row[0] or 0)
+        months[month] = []
+        for part, start in enumerate(range(0, len(rows), shard_size)):
+            chunk = rows[start:start + shard_size]
+            name = f"shard-{month}-{part:03d}.json"
+            write_atomic(os.path.join(data_dir, name), lambda f: json.dump(chunk, f, separators=(',', ':')))
+            timestamps = [row[0] for row in chunk if row[0] is not None]
+            months[month].append({
+                'file': name,
+                'month': month,
+                'count': len(chunk),
+                'oldest': min(timestamps) if timestamps else None,
+                'newest': max(timestamps) if timestamps else None,
+                'sources': sorted({row[1] for row in chunk}),
+            })
+    
+    shards = [shard for month in sorted(months) for shard in months[month]]
+    # Drop shards left over from an older layout, shard size or archive
+    names = {shard['file'] for shard in shards}
+    for name in os.listdir(data_dir):
+        if name.startswith('shard-') and name.endswith('.json') and name not in names:
+            os.remove(os.path.join(data_dir, name))
+    
+    manifest = {
+        'data_dir': data_dir.replace(os.sep, '/'),
+        'shard_size': shard_size,
+        'total': sum(shard['count'] for shard in shards),
+        'sources': sorted({source for shard in shards for source in shard['sources']}),
+        'shards': shards,
+    }
+    _write_if_changed(os.path.join(data_dir, 'manifest.json'), json.dumps(manifest, indent=4))
+    rewritten = sum(len(months[month]) for month in new_rows)
+    logging.info(f"Archive shards: {len(shards)} in {data_dir} ({manifest['total']} articles), "
+                 f"{rewritten} rewritten for {len(new_rows)} month(s)")
+    return manifest
+
+
+def generate_dashboard():
+    """
+    Generates an interactive HTML dashboard with news statistics and sentiment analysis.
+    Without OUTPUT_FILE (daily_scraper.py only writes the store), the
+    'latest' source falls back to the whole archive.
+    """
+    store = ArticleStore()
+    source = getattr(config, 'DASHBOARD_SOURCE', 'latest')
+    if source != 'history' and not os.path.exists(config.OUTPUT_FILE):
+        if not len(store):
+            logging.error(f"File {config.OUTPUT_FILE} not found. Please run scrapper.py first.")
+            return
+        logging.info(f"File {config.OUTPUT_FILE} not found, using the archive in {store.root}")
+        source = 'history'
+    
+    if source == 'history':
+        # Whole archive: read the persisted running stats and only the newest articles
+        stats = load_store_stats(store)
+        recent_articles = store.latest(RECENT_ARTICLES)
+        data_label = store.root
+    else:
+        # Stream the file once: aggregate every article, keep only the first rows
+        recent_articles = []
+        
+        def remember_recent(articles):
+            for article in articles:
+                if len(recent_articles) < RECENT_ARTICLES:
+                    recent_articles.append(article)
+                yield article
+        
+        articles = (Article.from_dict(data) for data in iter_json_array(config.OUTPUT_FILE))
+        stats = RunningStats().update(remember_recent(articles))
+        data_label = config.OUTPUT_FILE
+    
+    if not stats.total:
+        logging.warning("No articles found in the file.")
+        return
+    
+    # Emit the historical archive as lazily loaded shards for the archive browser
+    archive_manifest = None
+    trend = None
+    if len(store):
+        with metrics.span('shards', articles=len(store)):
+            archive_manifest = write_archive_shards(store)
+        newest = [segment['newest'] for segment in store.manifest['segments'] if segment['newest'] is not None]
+        if newest and getattr(config, 'ROLLUPS_ENABLED', True):
+            with metrics.span('trend'):
+                rollups = open_rollups(store)
+                trend = build_trend(rollups, max(newest))
+                rollups.close()
+    
+    # Save dashboard (written to a temp file and renamed, so a failed
+    # render never leaves a truncated page behind)
     dashboard_file = "dashboard.html"
-    with open(dashboard_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    with metrics.span('render', articles=stats.total) as span:
+        def render(f):
+            write_dashboard(f, stats, recent_articles, data_label, archive_manifest, trend)
+            span.add(bytes=f.tell())
+        write_atomic(dashboard_file, render)
     
     logging.info(f"Dashboard generated successfully: {dashboard_file}")
     logging.info(f"Open {dashboard_file} in your browser to view the dashboard")
     
     return dashboard_file
 
-if __name__ == "__main__":
+def main():
     generate_dashboard()
+    metrics.log_summary()
+    metrics.write_run_metrics('dashboard')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import calendar
+from datetime import date, datetime, timezone
+from email.utils import parsedate_tz
+
+# Field holding the publication time as integer seconds since the epoch (UTC).
+# Filled once at ingest so sorting, filtering and stats never re-parse pubDate.
+TIMESTAMP_FIELD = 'pubTimestamp'
+
+# Layout key -> parser that last succeeded for it. The key is the string
+# length plus its 5th character, which tells RSS ('Sat, 17 ...') and
+# ISO ('2026-10-...') layouts apart without scanning the whole string.
+_parser_for_shape = {}
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+_ZONES = {
+    'gmt': 0, 'utc': 0, 'ut': 0, 'z': 0,
+    'edt': -4, 'est': -5, 'cdt': -5, 'cst': -6,
+    'mdt': -6, 'mst': -7, 'pdt': -7, 'pst': -8,
+}
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _zone_offset(zone):
+    """
+    Returns the UTC offset in seconds of '+0530'-style or named zones, or None.
+    """
+    if zone[:1] in '+-' and len(zone) == 5 and zone[1:].isdigit():
+        seconds = int(zone[1:3]) * 3600 + int(zone[3:5]) * 60
+        return -seconds if zone[0] == '-' else seconds
+    hours = _ZONES.get(zone.lower())
+    return hours * 3600 if hours is not None else None
+
+
+def _parse_rfc822(value):
+    """
+    RSS dates, e.g. 'Sat, 17 Oct 2026 06:19:48 +0000' or '... GMT'.
+    The common layout is split by hand; anything else goes to the email parser.
+    """
+    parts = value.split()
+    if len(parts) == 6:
+        try:
+            day = int(parts[1])
+            month = _MONTHS[parts[2][:3].lower()]
+            year = int(parts[3])
+            clock = parts[4].split(':')
+            hour = int(clock[0])
+            minute = int(clock[1])
+            second = int(clock[2]) if len(clock) > 2 else 0
+            offset = _zone_offset(parts[5])
+            if offset is not None:
+                days = date(year, month, day).toordinal() - _EPOCH_ORDINAL
+                return days * 86400 + hour * 3600 + minute * 60 + second - offset
+        except (IndexError, KeyError, ValueError):
+            pass
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    offset = parsed[9] or 0
+    try:
+        return calendar.timegm(parsed[:6] + (0, 1, 0)) - offset
+    except (OverflowError, ValueError):
+        return None
+
+
+def _parse_iso(value):
+    """
+    ISO 8601 dates as used by NewsAPI and Atom, e.g. '2026-10-17T06:19:48Z'.
+    """
+    try:
+        date_obj = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if date_obj.tzinfo is None:
+        date_obj = date_obj.replace(tzinfo=timezone.utc)
+    return int(date_obj.timestamp())
+
+
+PARSERS = (_parse_iso, _parse_rfc822)
+
+
+def parse_pub_date(value):
+    """
+    Parses an RSS or ISO publication date into UTC epoch seconds.
+    Returns None for empty or unrecognized values.
+
+    The parser that worked for a given string layout is remembered, so
+    a feed's dates are normally parsed with a single attempt.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    shape = (len(value), value[4:5])
+    parser = _parser_for_shape.get(shape)
+    if parser is not None:
+        result = parser(value)
+        if result is not None:
+            return result
+    for parser in PARSERS:
+        result = parser(value)
+        if result is not None:
+            _parser_for_shape[shape] = parser
+            return result
+    return None
+
+
+def article_timestamp(article):
+    """
+    Returns the article's stored epoch timestamp, parsing pubDate only for
+    records written before the field existed.
+    """
+    ts = article.get(TIMESTAMP_FIELD)
+    if ts is None:
+        ts = parse_pub_date(article.get('pubDate'))
+    return ts
+
+
+def normalize_dates(articles):
+    """
+    Stores the parsed publication time on each article (None if unparseable).
+    """
+    for article in articles:
+        if TIMESTAMP_FIELD not in article:
+            article[TIMESTAMP_FIELD] = parse_pub_date(article.get('pubDate'))
+    return articles
+
+
+def format_day(ts):
+    """
+    Formats an epoch timestamp as 'YYYY-MM-DD' (UTC).
+    """
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime('%Y-%m-%d')
@@ -0,0 +1,82 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Query parameters that only track the click and never change the article
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', 'ocid', 'cmpid', 'cmp', 'smid', 'smtyp', 'taid',
+    'ref', 'ref_src', 'referrer', 'share', 'ito', 'at_medium', 'at_campaign',
+    'amp', 'outputtype',
+}
+TRACKING_PREFIXES = ('utm_', 'ns_', 'at_', 'pk_', 'mkt_', 'hsa_')
+
+# Host prefixes that serve the same article as the bare domain
+HOST_PREFIXES = ('www.', 'amp.', 'm.', 'mobile.')
+
+# AMP path variants: /amp, /amp/, .amp, .amp.html
+AMP_PATH = re.compile(r'(/amp/?$|\.amp(?=\.html?$)|\.amp$)', re.IGNORECASE)
+
+
+def canonicalize_url(url):
+    """
+    Reduces an article URL to a key that is equal for all variants of the
+    same article: scheme, 'www.'/'amp.'/'m.' hosts, AMP paths, fragments,
+    trailing slashes and tracking query parameters are ignored.
+    """
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+
+    host = parts.netloc.lower()
+    if '@' in host:
+        host = host.rsplit('@', 1)[1]
+    if host.endswith(':80') or host.endswith(':443'):
+        host = host.rsplit(':', 1)[0]
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+
+    path = AMP_PATH.sub('', parts.path)
+    path = path.rstrip('/') or '/'
+
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+
+    canonical = host + path
+    if query:
+        canonical += '?' + urlencode(query)
+    return canonical
+
+
+class DedupIndex:
+    """
+    Set of canonical article URLs with O(1) membership checks.
+    Shared by the NewsAPI scraper and the historical merge so both
+    agree on what counts as the same article.
+    """
+
+    def __init__(self, articles=()):
+        self.keys = set()
+        for article in articles:
+            self.add(article.get('link', ''))
+
+    def __contains__(self, url):
+        return canonicalize_url(url) in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, url):
+        """
+        Adds `url` to the index. Returns True if it was not already present.
+        """
+        key = canonicalize_url(url)
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        return True
@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+import threading
+
+import config
+from atomic import write_atomic
+
+DEFAULT_FEED_CACHE_FILE = "feed_cache.json"
+
+
+class FeedCache:
+    """
+    Persistent store of HTTP validators (ETag / Last-Modified) per feed URL.
+
+    Used to make conditional GETs so unchanged feeds come back as
+    304 Not Modified and are skipped without downloading or parsing.
+
+    A 304 only means "nothing new since the articles you stored", so each
+    consumer keeps its own file (the historical store: FEED_CACHE_FILE,
+    the one-off scrape: SCRAPE_FEED_CACHE_FILE) and calls save() only once
+    the articles of the feeds it fetched are durably stored.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or getattr(config, 'FEED_CACHE_FILE', DEFAULT_FEED_CACHE_FILE)
+        self.validators = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.validators = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable feed cache {self.path}: {e}")
+            self.validators = {}
+
+    def conditional_headers(self, url):
+        """
+        Returns the If-None-Match / If-Modified-Since headers for `url`.
+        """
+        entry = self.validators.get(url, {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record_not_modified(self, url):
+        with self._lock:
+            self.hits += 1
+
+    def record_response(self, url, headers):
+        """
+        Remembers the validators from a 200 response. Call this only once the
+        feed has been processed, so a crashed run does not skip it next time.
+        """
+        entry = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+        }
+        with self._lock:
+            self.misses += 1
+            if entry['etag'] or entry['last_modified']:
+                self.validators[url] = entry
+            else:
+                self.validators.pop(url, None)
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def log_summary(self):
+        total = self.hits + self.misses
+        logging.info(
+            f"Feed cache: {self.hits}/{total} feeds not modified "
+            f"({self.hit_rate() * 100:.0f}% hit rate)"
+        )
+
+    def save(self):
+        """
+        Writes the cache atomically (temp file + rename).
+        """
+        with self._lock:
+            write_atomic(self.path, lambda f: json.dump(self.validators, f, indent=4))
+
+
+def open_feed_cache(path=None):
+    """
+    Returns the FeedCache at `path` (default FEED_CACHE_FILE), or None when
+    USE_FEED_CACHE is off.
+    """
+    return FeedCache(path) if getattr(config, 'USE_FEED_CACHE', True) else None
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+import config
+import http_client
+import metrics
+
+# Defaults used when config.py does not override them
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PER_HOST_LIMIT = 4
+
+
+def _host_of(url):
+    """
+    Returns the lowercase host of a URL, used as the key for per-host limits.
+    """
+    return urlsplit(url).netloc.lower()
+
+
+def _get(url, cache):
+    """
+    Blocking fetch of a single feed. Runs on a worker thread.
+    Returns (content, headers), with content None if the feed is unchanged.
+    """
+    headers = cache.conditional_headers(url) if cache else None
+    response = http_client.get(url, headers=headers)
+    if response.status_code == 304:
+        return None, response.headers
+    response.raise_for_status()
+    return response.content, response.headers
+
+
+async def _fetch_one(loop, executor, source_name, url, global_limit, host_limits, cache):
+    """
+    Fetches one feed while holding both the global and the per-host slot.
+    Returns (source_name, url, content, headers); content is None on
+    failure or when the feed has not changed since the last run.
+    """
+    async with global_limit, host_limits[_host_of(url)]:
+        logging.info(f"Scraping {source_name}...")
+        try:
+            content, headers = await loop.run_in_executor(executor, _get, url, cache)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Error fetching RSS feed from {url}: {e}")
+            metrics.add('fetch', errors=1)
+            return source_name, url, None, None
+    if content is None:
+        logging.info(f"{source_name} not modified since last run, skipping")
+        cache.record_not_modified(url)
+        metrics.add('fetch', not_modified=1)
+    else:
+        metrics.add('fetch', documents=1, bytes=len(content))
+    return source_name, url, content, headers
+
+
+async def _fetch_all(sources, on_feed, on_error, on_not_modified, concurrency, per_host_limit, cache):
+    loop = asyncio.get_running_loop()
+    global_limit = asyncio.Semaphore(concurrency)
+    host_limits = defaultdict(lambda: asyncio.Semaphore(per_host_limit))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        tasks = [
+            asyncio.ensure_future(
+                _fetch_one(loop, executor, name, url, global_limit, host_limits, cache)
+            )
+            for name, url in sources.items()
+        ]
+        # Hand each feed to the caller as soon as it arrives so parsing
+        # overlaps with the fetches that are still in flight
+        for finished in asyncio.as_completed(tasks):
+            source_name, url, content, headers = await finished
+            if content is not None:
+                on_feed(source_name, content)
+                if cache:
+                    cache.record_response(url, headers)
+            elif headers is None:
+                if on_error is not None:
+                    on_error(source_name)
+            elif on_not_modified is not None:
+                on_not_modified(source_name)
+
+
+def fetch_feeds(sources, on_feed, concurrency=None, per_host_limit=None, on_error=None,
+                cache=None, on_not_modified=None):
+    """
+    Fetches all feeds in `sources` (a {source_name: url} dict) concurrently.
+
+    `on_feed(source_name, content)` is called once per successfully fetched
+    feed, in arrival order, and `on_error(source_name)` (if given) once per
+    feed that could not be fetched. At most `concurrency` requests are in flight
+    overall and at most `per_host_limit` against any single host.
+
+    With a FeedCache as `cache`, requests are conditional on its validators;
+    unchanged feeds are skipped (`on_not_modified(source_name)` is called
+    instead of `on_feed`) and the validators of the feeds handed to
+    `on_feed` are recorded in the cache. The caller saves the cache once it
+    has stored what on_feed produced.
+    """
+    if concurrency is None:
+        concurrency = getattr(config, 'FETCH_CONCURRENCY', DEFAULT_CONCURRENCY)
+    if per_host_limit is None:
+        per_host_limit = getattr(config, 'FETCH_PER_HOST_LIMIT', DEFAULT_PER_HOST_LIMIT)
+
+    if not sources:
+        return
+
+    with metrics.span('fetch'):
+        asyncio.run(_fetch_all(sources, on_feed, on_error, on_not_modified,
+                               max(1, concurrency), max(1, per_host_limit), cache))
+
+    if cache:
+        cache.log_summary()
@@ -0,0 +1,162 @@
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+# Defaults used when config.py does not override them
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 20
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30
+DEFAULT_POOL_SIZE = 16
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+
+# Per-host request latencies (seconds) collected during this process
+_latencies = defaultdict(list)
+_latencies_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Returns the process-wide requests.Session, creating it on first use.
+    Connections are kept alive and pooled per host.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            pool_size = getattr(config, 'HTTP_POOL_SIZE', DEFAULT_POOL_SIZE)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+def _retry_after_seconds(response):
+    """
+    Parses a Retry-After header (delta-seconds or HTTP-date) into seconds.
+    Returns None if the header is missing or unparseable.
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _backoff_seconds(attempt):
+    """
+    Full-jitter exponential backoff for the given retry attempt (1-based).
+    """
+    base = getattr(config, 'HTTP_BACKOFF_BASE', DEFAULT_BACKOFF_BASE)
+    cap = getattr(config, 'HTTP_BACKOFF_MAX', DEFAULT_BACKOFF_MAX)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _record_latency(host, elapsed):
+    with _latencies_lock:
+        _latencies[host].append(elapsed)
+
+
+def get(url, params=None, headers=None):
+    """
+    GET `url` through the shared session with connect/read timeouts.
+
+    Connection errors, timeouts and retryable statuses (429, 5xx) are retried
+    with jittered exponential backoff, honoring Retry-After when present.
+    Returns the final response without raising for its status; raises
+    requests.exceptions.RequestException if every attempt failed to connect.
+    """
+    timeout = (
+        getattr(config, 'HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT),
+        getattr(config, 'HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT),
+    )
+    max_retries = getattr(config, 'HTTP_MAX_RETRIES', DEFAULT_MAX_RETRIES)
+    backoff_cap = getattr(config, 'HTTP_BACKOFF_MAX', DEFAULT_BACKOFF_MAX)
+    session = get_session()
+    host = urlsplit(url).netloc.lower()
+
+    attempt = 0
+    while True:
+        start = time.perf_counter()
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            _record_latency(host, time.perf_counter() - start)
+            if attempt >= max_retries:
+                raise
+            attempt += 1
+            delay = _backoff_seconds(attempt)
+            logging.warning(f"Request to {host} failed ({e}); retry {attempt}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        elapsed = time.perf_counter() - start
+        _record_latency(host, elapsed)
+        logging.debug(f"GET {host}{urlsplit(url).path} -> {response.status_code} in {elapsed * 1000:.0f} ms")
+
+        if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+            return response
+
+        attempt += 1
+        delay = _retry_after_seconds(response)
+        if delay is None:
+            delay = _backoff_seconds(attempt)
+        delay = min(delay, backoff_cap)
+        logging.warning(f"{host} returned {response.status_code}; retry {attempt}/{max_retries} in {delay:.1f}s")
+        response.close()
+        time.sleep(delay)
+
+
+def latency_summary():
+    """
+    Returns {host: {'requests', 'p50_ms', 'p95_ms', 'max_ms'}} for this process.
+    """
+    summary = {}
+    with _latencies_lock:
+        items = [(host, sorted(values)) for host, values in _latencies.items()]
+    for host, values in items:
+        n = len(values)
+        summary[host] = {
+            'requests': n,
+            'p50_ms': round(values[(n - 1) // 2] * 1000, 1),
+            'p95_ms': round(values[min(n - 1, int(n * 0.95))] * 1000, 1),
+            'max_ms': round(values[-1] * 1000, 1),
+        }
+    return summary
+
+
+def log_latency_summary():
+    """
+    Logs one latency line per host contacted during this process.
+    """
+    for host, stats in sorted(latency_summary().items()):
+        logging.info(
+            f"HTTP {host}: {stats['requests']} requests, "
+            f"p50 {stats['p50_ms']} ms, p95 {stats['p95_ms']} ms, max {stats['max_ms']} ms"
+        )
@@ -0,0 +1,87 @@
+import json
+import os
+import re
+
+# Characters read from the file at a time
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_CHARS = frozenset('0123456789.eE+-')
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields the elements of a top-level JSON array one at a time, reading
+    `source` (a path or a text file object) in chunks.
+
+    Memory use is bounded by the largest single element plus one chunk,
+    not by the size of the file, so archives like articles_historical.json
+    can be scanned without loading them whole. Raises ValueError if the
+    document is not a well-formed JSON array.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from _iter_elements(f, chunk_size)
+    else:
+        yield from _iter_elements(source, chunk_size)
+
+
+def _iter_elements(f, chunk_size):
+    buf = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        # Drops the consumed prefix and reads another chunk. Returns False at EOF.
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace():
+        # Advances pos to the next significant character, reading as needed
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or not fill():
+                return pos < len(buf)
+
+    if not skip_whitespace() or buf[pos] != '[':
+        raise ValueError("Expected a JSON array")
+    pos += 1
+    if not skip_whitespace():
+        raise ValueError("Unterminated JSON array")
+
+    while buf[pos] != ']':
+        # Decode the next element. A number cut off by the end of the buffer
+        # ('12' of '12.5') still decodes, so a value is only accepted once the
+        # character after it has been read and cannot continue a number.
+        while True:
+            try:
+                element, end = _decoder.raw_decode(buf, pos)
+                if eof or (end < len(buf) and buf[end] not in _NUMBER_CHARS):
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+        pos = end
+        yield element
+
+        if not skip_whitespace():
+            raise ValueError("Unterminated JSON array")
+        if buf[pos] == ',':
+            pos += 1
+            if not skip_whitespace() or buf[pos] == ']':
+                raise ValueError("Expected a value after ',' in JSON array")
+        elif buf[pos] != ']':
+            raise ValueError(f"Expected ',' or ']' in JSON array, got {buf[pos]!r}")
+
+    pos += 1
+    if skip_whitespace():
+        raise ValueError("Extra data after JSON array")
@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import config
+from atomic import write_atomic
+
+# Defaults used when config.py does not override them
+DEFAULT_METRICS_DIR = "metrics"
+
+# Stage name -> {'calls', 'seconds', 'max_seconds', counter name -> total}
+_stages = {}
+_lock = threading.Lock()
+_started = time.time()
+
+
+def _stage(name):
+    stage = _stages.get(name)
+    if stage is None:
+        stage = _stages[name] = {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0}
+    return stage
+
+
+def add(name, **counters):
+    """
+    Adds to the counters of stage `name` (e.g. count=1, bytes=2048) without
+    timing anything. Safe to call from worker threads.
+    """
+    with _lock:
+        stage = _stage(name)
+        for counter, value in counters.items():
+            stage[counter] = stage.get(counter, 0) + value
+
+
+class Span:
+    """
+    Counters collected while a span is open; added to its stage on exit.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.counters = {}
+
+    def add(self, **counters):
+        for counter, value in counters.items():
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+
+@contextmanager
+def span(name, **counters):
+    """
+    Times a block as one call of stage `name`:
+
+        with metrics.span('parse', bytes=len(content)) as s:
+            ...
+            s.add(count=len(items))
+
+    Calls of the same stage are summed (elapsed time, counters) and the
+    slowest call is kept. Spans may nest; each stage reports its own time.
+    """
+    current = Span(name)
+    current.add(**counters)
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            stage = _stage(name)
+            stage['calls'] += 1
+            stage['seconds'] += elapsed
+            stage['max_seconds'] = max(stage['max_seconds'], elapsed)
+            for counter, value in current.counters.items():
+                stage[counter] = stage.get(counter, 0) + value
+
+
+def reset():
+    """
+    Clears all stages, starting a new run.
+    """
+    global _started
+    with _lock:
+        _stages.clear()
+        _started = time.time()
+
+
+def snapshot():
+    """
+    Returns the run's metrics as a JSON-serializable dict.
+    """
+    with _lock:
+        return {
+            'started': datetime.fromtimestamp(_started).isoformat(timespec='seconds'),
+            'elapsed_seconds': round(time.time() - _started, 3),
+            'stages': {
+                name: {field: round(value, 6) if isinstance(value, float) else value
+                       for field, value in stage.items()}
+                for name, stage in _stages.items()
+            },
+        }
+
+
+def log_summary():
+    """
+    Logs one line per stage: calls, elapsed time and counters.
+    """
+    for name, stage in snapshot()['stages'].items():
+        counters = ", ".join(
+            f"{counter}={value}" for counter, value in stage.items()
+            if counter not in ('calls', 'seconds', 'max_seconds')
+        )
+        logging.info(
+            f"Stage {name}: {stage['calls']} call(s), {stage['seconds']:.3f}s "
+            f"(slowest {stage['max_seconds']:.3f}s){', ' + counters if counters else ''}"
+        )
+
+
+def prometheus_text(job):
+    """
+    Renders the run's metrics in the Prometheus text exposition format.
+    """
+    data = snapshot()
+    lines = [
+        "# HELP news_scraper_run_seconds Wall-clock duration of the last run.",
+        "# TYPE news_scraper_run_seconds gauge",
+        f'news_scraper_run_seconds{{job="{job}"}} {data["elapsed_seconds"]}',
+        "# HELP news_scraper_run_timestamp_seconds Start time of the last run.",
+        "# TYPE news_scraper_run_timestamp_seconds gauge",
+        f'news_scraper_run_timestamp_seconds{{job="{job}"}} {int(_started)}',
+    ]
+    series = {}
+    for name, stage in data['stages'].items():
+        for field, value in stage.items():
+            series.setdefault(field, []).append((name, value))
+    for field, values in series.items():
+        metric = f"news_scraper_stage_{field}"
+        if field in ('calls', 'seconds', 'max_seconds'):
+            description = {'calls': "Calls of the stage", 'seconds': "Total time spent in the stage",
+                           'max_seconds': "Slowest single call of the stage"}[field]
+        else:
+            description = f"Total {field} handled by the stage"
+        lines.append(f"# HELP {metric} {description} in the last run.")
+        lines.append(f"# TYPE {metric} gauge")
+        for name, value in values:
+            lines.append(f'{metric}{{job="{job}",stage="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_run_metrics(job):
+    """
+    Writes this run's metrics to METRICS_DIR/<job>_<YYYYMMDD_HHMMSS>.json
+    and, with METRICS_PROMETHEUS on, METRICS_DIR/<job>.prom (overwritten
+    each run, for a node_exporter textfile collector). Returns the JSON path.
+    """
+    metrics_dir = getattr(config, 'METRICS_DIR', DEFAULT_METRICS_DIR)
+    if not metrics_dir:
+        return None
+    os.makedirs(metrics_dir, exist_ok=True)
+    stamp = datetime.fromtimestamp(_started).strftime('%Y%m%d_%H%M%S')
+    path = os.path.join(metrics_dir, f"{job}_{stamp}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dict(snapshot(), job=job), f, indent=4)
+
+    if getattr(config, 'METRICS_PROMETHEUS', False):
+        prom_path = os.path.join(metrics_dir, f"{job}.prom")
+        write_atomic(prom_path, lambda f: f.write(prometheus_text(job)))
+    logging.info(f"Wrote run metrics to {path}")
+    return path
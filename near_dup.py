@@ -0,0 +1,280 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+
+import config
+
+INDEX_FILE = "near_dup_index.sqlite3"
+LEGACY_INDEX_FILE = "near_dup_index.json"  # Whole-index JSON written by older versions
+
+# Defaults used when config.py does not override them
+DEFAULT_BANDS = 16
+DEFAULT_ROWS = 4  # BANDS * ROWS = signature length
+DEFAULT_THRESHOLD = 0.5  # Estimated Jaccard similarity to join a cluster
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def shingles(text, size=3):
+    """
+    Returns the set of word `size`-grams of `text` (lowercased, punctuation
+    dropped). Texts shorter than `size` words fall back to single words.
+    """
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) < size:
+        return set(tokens)
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def _article_text(article):
+    return f"{article.get('title') or ''} {article.get('description') or ''}"
+
+
+class NearDupIndex:
+    """
+    MinHash signatures plus a banded LSH table that assign cluster IDs to
+    near-duplicate articles (the same wire story under different titles
+    and URLs).
+
+    Only one representative per cluster is indexed. A new article looks up
+    its BANDS buckets, checks the few candidate representatives by
+    estimated Jaccard similarity and either joins the best one or starts a
+    new cluster, so each assignment costs O(bands), not O(archive).
+    """
+
+    def __init__(self, bands=None, rows=None, threshold=None, seed=1):
+        self.bands = bands or getattr(config, 'NEAR_DUP_BANDS', DEFAULT_BANDS)
+        self.rows = rows or getattr(config, 'NEAR_DUP_ROWS', DEFAULT_ROWS)
+        self.threshold = threshold or getattr(config, 'NEAR_DUP_THRESHOLD', DEFAULT_THRESHOLD)
+        self.seed = seed
+        rng = random.Random(seed)
+        self.perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(self.bands * self.rows)
+        ]
+        self.buckets = {}  # band key -> cluster id
+        self.signatures = {}  # cluster id -> representative signature
+        self.next_cluster = 0
+
+    def signature(self, text):
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+            for shingle in shingles(text)
+        ]
+        if not hashes:
+            return None
+        return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self.perms]
+
+    def _band_keys(self, signature):
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(repr(rows).encode('ascii'), digest_size=8).hexdigest()
+            keys.append(f"{band}:{digest}")
+        return keys
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        """
+        Estimated Jaccard similarity: share of equal MinHash values.
+        """
+        return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+    def assign(self, text):
+        """
+        Returns the cluster ID for `text`, creating a new cluster if no
+        indexed representative is similar enough.
+        """
+        signature = self.signature(text)
+        if signature is None:
+            cluster = self.next_cluster
+            self.next_cluster += 1
+            return cluster
+
+        keys = self._band_keys(signature)
+        candidates = self._candidates(keys)
+        best, best_score = None, self.threshold
+        for cluster in candidates:
+            score = self.similarity(signature, self._representative(cluster))
+            if score >= best_score:
+                best, best_score = cluster, score
+        if best is not None:
+            return best
+
+        cluster = self.next_cluster
+        self.next_cluster += 1
+        self.signatures[cluster] = signature
+        self._claim_buckets(keys, cluster)
+        return cluster
+
+    def _candidates(self, keys):
+        return {self.buckets[key] for key in keys if key in self.buckets}
+
+    def _representative(self, cluster):
+        return self.signatures[cluster]
+
+    def _claim_buckets(self, keys, cluster):
+        # A bucket keeps the first cluster that lands in it
+        for key in keys:
+            self.buckets.setdefault(key, cluster)
+
+    def assign_articles(self, articles):
+        """
+        Sets 'cluster_id' on each article. Returns the number of new clusters.
+        """
+        before = self.next_cluster
+        for article in articles:
+            article['cluster_id'] = self.assign(_article_text(article))
+        created = self.next_cluster - before
+        logging.info(
+            f"Near-duplicates: {len(articles)} articles, {created} new stories, "
+            f"{len(articles) - created} joined existing stories"
+        )
+        return created
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (cluster INTEGER PRIMARY KEY, signature TEXT);
+CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, cluster INTEGER) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+"""
+
+
+class StoredNearDupIndex(NearDupIndex):
+    """
+    NearDupIndex kept in an SQLite file next to the store.
+
+    Lookups read only the buckets and representatives a new article needs,
+    and save() writes only the clusters created since the last save, so a
+    run costs O(new articles), whatever the size of the archive. Like the
+    search index, it records how many store articles it covers in the same
+    transaction. The LSH parameters it was built with are kept with it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(_SCHEMA)
+        meta = dict(self.db.execute("SELECT key, value FROM meta"))
+        super().__init__(
+            bands=meta.get('bands'), rows=meta.get('rows'), threshold=meta.get('threshold'), seed=meta.get('seed', 1)
+        )
+        self.next_cluster = meta.get('next_cluster', 0)
+        self.articles = meta.get('articles')  # Store articles covered, None if not recorded
+
+    def _candidates(self, keys):
+        found = super()._candidates(keys)
+        sql = f"SELECT cluster FROM buckets WHERE key IN ({', '.join('?' * len(keys))})"
+        found.update(cluster for cluster, in self.db.execute(sql, keys))
+        return found
+
+    def _representative(self, cluster):
+        if cluster in self.signatures:
+            return self.signatures[cluster]
+        row = self.db.execute("SELECT signature FROM signatures WHERE cluster = ?", (cluster,)).fetchone()
+        return json.loads(row[0])
+
+    def _claim_buckets(self, keys, cluster):
+        sql = f"SELECT key FROM buckets WHERE key IN ({', '.join('?' * len(keys))})"
+        taken = {key for key, in self.db.execute(sql, keys)}
+        super()._claim_buckets([key for key in keys if key not in taken], cluster)
+
+    def _has_representative(self, cluster):
+        if cluster in self.signatures:
+            return True
+        return self.db.execute("SELECT 1 FROM signatures WHERE cluster = ?", (cluster,)).fetchone() is not None
+
+    def add_stored(self, articles):
+        """
+        Indexes the clusters of already clustered articles (e.g. read back
+        from the store) that have no representative yet.
+        """
+        for article in articles:
+            cluster = article.get('cluster_id')
+            if cluster is None:
+                continue
+            self.next_cluster = max(self.next_cluster, cluster + 1)
+            if not self._has_representative(cluster):
+                signature = self.signature(_article_text(article))
+                if signature is not None:
+                    self.signatures[cluster] = signature
+                    self._claim_buckets(self._band_keys(signature), cluster)
+
+    def save(self, covered):
+        """
+        Writes the clusters created since the last save and records that
+        the index covers the first `covered` store articles, atomically.
+        """
+        meta = {
+            'bands': self.bands,
+            'rows': self.rows,
+            'threshold': self.threshold,
+            'seed': self.seed,
+            'next_cluster': self.next_cluster,
+            'articles': covered,
+        }
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO signatures (cluster, signature) VALUES (?, ?)",
+                [(cluster, json.dumps(sig)) for cluster, sig in self.signatures.items()],
+            )
+            self.db.executemany("INSERT OR IGNORE INTO buckets (key, cluster) VALUES (?, ?)", self.buckets.items())
+            self.db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", meta.items())
+        self.signatures.clear()
+        self.buckets.clear()
+        self.articles = covered
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM signatures")
+            self.db.execute("DELETE FROM buckets")
+            self.db.execute("DELETE FROM meta WHERE key IN ('next_cluster', 'articles')")
+        self.signatures.clear()
+        self.buckets.clear()
+        self.next_cluster = 0
+        self.articles = None
+
+    def close(self):
+        self.db.close()
+
+
+def index_path(store):
+    return os.path.join(store.root, INDEX_FILE)
+
+
+def load_store_index(store):
+    """
+    Opens the near-duplicate index for `store` and indexes the clusters of
+    any committed articles it does not cover yet, reading only the
+    segments that hold them. An index that is missing, claims more
+    articles than the store has or predates article counts is rebuilt from
+    the cluster IDs stored on the articles.
+    """
+    os.makedirs(store.root, exist_ok=True)
+    legacy_path = os.path.join(store.root, LEGACY_INDEX_FILE)
+    if os.path.exists(legacy_path):
+        os.remove(legacy_path)
+    index = StoredNearDupIndex(index_path(store))
+    if index.articles is None or index.articles > len(store):
+        if index.articles is not None:
+            logging.warning(f"{index.path} does not match {store.root}, rebuilding it")
+        index.clear()
+    for covered, articles in store.iter_batches(index.articles or 0):
+        index.add_stored(articles)
+        index.save(covered)
+    if index.articles is None:
+        index.save(len(store))
+    return index
+
+
+def save_store_index(store, index):
+    """
+    Saves the clusters created since the index was opened or last saved,
+    recording that it covers every article now in `store`.
+    """
+    index.save(len(store))
@@ -0,0 +1,248 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+import checkpoint
+import config
+import http_client
+import metrics
+from atomic import write_atomic
+from topics import newsapi_query
+
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+PAGE_SIZE = 100  # Max per request
+
+# Defaults used when config.py does not override them
+DEFAULT_DAILY_QUOTA = 100  # Free tier: 100 requests per day
+DEFAULT_REQUESTS_PER_SECOND = 2
+DEFAULT_CONCURRENCY = 4
+DEFAULT_WINDOW_DAYS = 1
+DEFAULT_MAX_RESULTS_PER_QUERY = 100  # Free tier serves only the first 100 results of a query
+DEFAULT_QUOTA_FILE = "newsapi_quota.json"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a token is available, then takes it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class QuotaLimiter:
+    """
+    Paces NewsAPI requests with a token bucket and enforces the daily quota.
+
+    Requests used per UTC day are persisted, so separate runs on the same
+    day share the quota instead of each assuming the full allowance.
+    """
+
+    def __init__(self, daily_quota=None, requests_per_second=None, path=None):
+        self.daily_quota = daily_quota or getattr(config, 'NEWS_API_DAILY_QUOTA', DEFAULT_DAILY_QUOTA)
+        self.bucket = TokenBucket(
+            requests_per_second or getattr(config, 'NEWS_API_REQUESTS_PER_SECOND', DEFAULT_REQUESTS_PER_SECOND)
+        )
+        self.path = path or getattr(config, 'NEWS_API_QUOTA_FILE', DEFAULT_QUOTA_FILE)
+        self.day = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        self.used = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable quota file {self.path}: {e}")
+            return
+        if data.get('date') == self.day:
+            self.used = data.get('used', 0)
+
+    def _save(self):
+        write_atomic(self.path, lambda f: json.dump({'date': self.day, 'used': self.used}, f))
+
+    @property
+    def remaining(self):
+        return max(0, self.daily_quota - self.used)
+
+    def acquire(self):
+        """
+        Reserves one request. Returns False once today's quota is spent.
+        """
+        with self._lock:
+            if self.used >= self.daily_quota:
+                return False
+            self.used += 1
+            self._save()
+        self.bucket.acquire()
+        return True
+
+
+def date_windows(start_date, end_date, window_days):
+    """
+    Splits [start_date, end_date] into consecutive windows of `window_days`,
+    newest first, as ('YYYY-MM-DD', 'YYYY-MM-DD') pairs.
+    """
+    windows = []
+    window_end = end_date
+    while window_end >= start_date:
+        window_start = max(start_date, window_end - timedelta(days=window_days - 1))
+        windows.append((window_start.strftime('%Y-%m-%d'), window_end.strftime('%Y-%m-%d')))
+        window_end = window_start - timedelta(days=1)
+    return windows
+
+
+def query_params():
+    """
+    Returns the NewsAPI parameters shared by every window and page.
+    """
+    params = {
+        'q': newsapi_query(),
+        'domains': getattr(config, 'NEWS_API_DOMAINS', None),
+        'language': 'en',
+        'sortBy': 'publishedAt',
+        'pageSize': PAGE_SIZE,
+    }
+    # Remove None values
+    return {k: v for k, v in params.items() if v is not None}
+
+
+def _fetch_page(limiter, query, window, page):
+    """
+    Fetches one page of one window. Returns (window, page, data) where data
+    is the decoded NewsAPI response, or None if nothing usable came back.
+    """
+    if not limiter.acquire():
+        return window, page, None
+
+    params = dict(query, page=page, apiKey=config.NEWS_API_KEY)
+    params['from'], params['to'] = window
+
+    try:
+        response = http_client.get(NEWS_API_URL, params=params)
+        data = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logging.error(f"Error fetching from NewsAPI ({window[0]}..{window[1]}, page {page}): {e}")
+        metrics.add('fetch', errors=1)
+        return window, page, None
+    metrics.add('fetch', documents=1, bytes=len(response.content))
+
+    if data.get('status') != 'ok':
+        logging.error(f"NewsAPI error ({window[0]}..{window[1]}, page {page}): {data.get('message', 'Unknown error')}")
+        return window, page, None
+    return window, page, data
+
+
+def fetch_newsapi_articles(start_date, end_date, max_articles):
+    """
+    Fetches up to `max_articles` raw NewsAPI articles between two dates.
+
+    The range is split into day windows (NEWS_API_WINDOW_DAYS) so each
+    query stays under the per-query result cap. Windows and pages are
+    fetched concurrently, newest window first; further pages are requested
+    only when a window's totalResults says they exist, and nothing more is
+    requested once enough articles are in hand or the daily quota is spent.
+
+    During a checkpointed run (see checkpoint.py) every page is saved as it
+    arrives, and pages saved by an interrupted run are reused without a
+    request.
+    """
+    window_days = max(1, getattr(config, 'NEWS_API_WINDOW_DAYS', DEFAULT_WINDOW_DAYS))
+    concurrency = max(1, getattr(config, 'NEWS_API_CONCURRENCY', DEFAULT_CONCURRENCY))
+    max_results = getattr(config, 'NEWS_API_MAX_RESULTS_PER_QUERY', DEFAULT_MAX_RESULTS_PER_QUERY)
+
+    limiter = QuotaLimiter()
+    run = checkpoint.current()
+    query = query_params()
+    windows = date_windows(start_date, end_date, window_days)
+    logging.info(
+        f"Fetching {len(windows)} window(s) of {window_days} day(s), "
+        f"{limiter.remaining}/{limiter.daily_quota} requests left today"
+    )
+
+    pages = {}
+    queue = deque((window, 1) for window in windows)
+    in_flight = {}
+    fetched = 0
+    resumed = 0
+
+    def take(window, page, data):
+        nonlocal fetched
+        pages[(window, page)] = data
+        fetched += len(data['articles'])
+        if page == 1:
+            # totalResults says how many further pages exist; queue them
+            # ahead of older windows so the newest window completes first
+            available = data['totalResults']
+            if max_results:
+                available = min(available, max_results)
+            for next_page in range(math.ceil(available / PAGE_SIZE), 1, -1):
+                queue.appendleft((window, next_page))
+
+    with metrics.span('fetch') as span, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while queue or in_flight:
+            # Keep up to `concurrency` requests in flight, but never more than
+            # could still be needed to reach max_articles or allowed by the
+            # quota; pages checkpointed by an interrupted run cost no request
+            while queue and len(in_flight) < concurrency and fetched + len(in_flight) * PAGE_SIZE < max_articles:
+                window, page = queue.popleft()
+                data = run.load_page(query, window, page) if run else None
+                if data is not None:
+                    resumed += 1
+                    take(window, page, data)
+                elif limiter.remaining:
+                    in_flight[executor.submit(_fetch_page, limiter, query, window, page)] = (window, page)
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                del in_flight[future]
+                window, page, data = future.result()
+                if data is None:
+                    continue
+                if run:
+                    run.save_page(query, window, page, data)
+                take(window, page, data)
+        span.add(resumed=resumed)
+
+    articles = []
+    for window in windows:
+        for page in sorted(page for w, page in pages if w == window):
+            articles.extend(pages[(window, page)]['articles'])
+
+    logging.info(
+        f"NewsAPI: {len(pages)} page(s) fetched ({resumed} from checkpoints), {len(articles)} articles, "
+        f"{limiter.remaining} requests left today"
+    )
+    return articles
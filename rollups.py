@@ -0,0 +1,207 @@
+import logging
+import math
+import os
+import sqlite3
+from datetime import date
+
+from dates import article_timestamp, format_day
+
+ROLLUPS_FILE = "rollups.sqlite3"
+
+PERIODS = ('day', 'week', 'month')
+LABELS = ('positive', 'negative', 'neutral')
+# Topic value of the rows that count every article once, whatever its topics
+ALL_TOPICS = '*'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT,
+    bucket TEXT,
+    source TEXT,
+    topic TEXT,
+    count INTEGER,
+    polarity_sum REAL,
+    polarity_sumsq REAL,
+    positive INTEGER,
+    negative INTEGER,
+    neutral INTEGER,
+    PRIMARY KEY (period, bucket, source, topic)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+"""
+
+_UPSERT = """
+INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (period, bucket, source, topic) DO UPDATE SET
+    count = count + excluded.count,
+    polarity_sum = polarity_sum + excluded.polarity_sum,
+    polarity_sumsq = polarity_sumsq + excluded.polarity_sumsq,
+    positive = positive + excluded.positive,
+    negative = negative + excluded.negative,
+    neutral = neutral + excluded.neutral
+"""
+
+
+def buckets_for_day(day):
+    """
+    Returns the (day, week, month) bucket labels of a 'YYYY-MM-DD' day:
+    '2026-10-17', '2026-W42' (ISO week) and '2026-10'. Labels of each
+    period sort chronologically as strings.
+    """
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return day, f"{year}-W{week:02d}", day[:7]
+
+
+def bucket(period, ts):
+    """
+    Returns the `period` bucket label of an epoch timestamp.
+    """
+    return buckets_for_day(format_day(ts))[PERIODS.index(period)]
+
+
+class Rollups:
+    """
+    Materialized sentiment time series, keyed by (period, bucket, source,
+    topic), with the article count, polarity sum and sum of squares and
+    the count of each sentiment label.
+
+    Every article is counted once under topic ALL_TOPICS and once under
+    each of its topics, in its day, ISO week and month. Adding articles
+    only touches the rows of their buckets, so a daily collection costs
+    O(new articles), and a trend query reads one row per bucket and
+    source instead of scanning the archive. Undated articles are left out.
+
+    Like the search index, it records how many store articles it covers,
+    in the same transaction as the rows.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(_SCHEMA)
+        self._day_buckets = {}
+
+    @property
+    def articles(self):
+        """
+        Number of store articles covered, or None if not recorded.
+        """
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'articles'").fetchone()
+        return row[0] if row else None
+
+    def add(self, articles, covered):
+        """
+        Folds `articles` into the rollups and records that they now cover
+        the first `covered` store articles, atomically.
+        """
+        rows = {}
+        for article in articles:
+            ts = article_timestamp(article)
+            if ts is None:
+                continue
+            day = format_day(ts)
+            buckets = self._day_buckets.get(day)
+            if buckets is None:
+                buckets = self._day_buckets[day] = buckets_for_day(day)
+            sentiment = article['sentiment']
+            polarity = sentiment['polarity']
+            label = sentiment['label']
+            topics = (ALL_TOPICS,) + tuple(article.get('topics') or ())
+            for period, bucket_label in zip(PERIODS, buckets):
+                for topic in topics:
+                    key = (period, bucket_label, article['source'], topic)
+                    row = rows.get(key)
+                    if row is None:
+                        row = rows[key] = [0, 0.0, 0.0, 0, 0, 0]
+                    row[0] += 1
+                    row[1] += polarity
+                    row[2] += polarity * polarity
+                    if label in LABELS:
+                        row[3 + LABELS.index(label)] += 1
+
+        with self.db:
+            self.db.executemany(_UPSERT, [key + tuple(row) for key, row in rows.items()])
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('articles', ?)", (covered,))
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM rollups")
+            self.db.execute("DELETE FROM meta WHERE key IN ('articles', 'segments')")
+
+    def trend(self, period='week', source=None, topic=ALL_TOPICS, start=None, end=None):
+        """
+        Returns one dict per `period` bucket, oldest first: bucket, count,
+        avg_polarity, polarity_stddev and the count of each label.
+
+        Without `source` all sources are summed. `start` / `end` (aware
+        datetimes) select the buckets that contain them and those between.
+        """
+        where, params = self._where(period, topic, source, start, end)
+        sql = (
+            "SELECT bucket, SUM(count), SUM(polarity_sum), SUM(polarity_sumsq),"
+            " SUM(positive), SUM(negative), SUM(neutral)"
+            f" FROM rollups WHERE {where} GROUP BY bucket ORDER BY bucket"
+        )
+
+        points = []
+        for bucket_label, count, polarity_sum, polarity_sumsq, *label_counts in self.db.execute(sql, params):
+            avg = polarity_sum / count
+            points.append({
+                'bucket': bucket_label,
+                'count': count,
+                'avg_polarity': avg,
+                'polarity_stddev': math.sqrt(max(0.0, polarity_sumsq / count - avg * avg)),
+                **dict(zip(LABELS, label_counts)),
+            })
+        return points
+
+    def top_sources(self, n, period='week', topic=ALL_TOPICS, start=None, end=None):
+        """
+        Returns the `n` sources with the most articles in the selected
+        buckets, as (source, count) pairs, most articles first.
+        """
+        where, params = self._where(period, topic, None, start, end)
+        sql = f"SELECT source, SUM(count) FROM rollups WHERE {where} GROUP BY source ORDER BY 2 DESC, 1 LIMIT ?"
+        return self.db.execute(sql, params + [n]).fetchall()
+
+    @staticmethod
+    def _where(period, topic, source, start, end):
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period {period!r}, expected one of {', '.join(PERIODS)}")
+        conditions = ["period = ?", "topic = ?"]
+        params = [period, topic]
+        if source:
+            conditions.append("source = ?")
+            params.append(source)
+        if start:
+            conditions.append("bucket >= ?")
+            params.append(bucket(period, start.timestamp()))
+        if end:
+            conditions.append("bucket <= ?")
+            params.append(bucket(period, end.timestamp()))
+        return " AND ".join(conditions), params
+
+    def close(self):
+        self.db.close()
+
+
+def rollups_path(store):
+    return os.path.join(store.root, ROLLUPS_FILE)
+
+
+def open_rollups(store):
+    """
+    Opens the rollups of `store` and folds in any committed articles they
+    do not cover yet, reading only the segments that hold them. Rollups
+    that claim more articles than the store has, or that predate article
+    counts, are rebuilt.
+    """
+    os.makedirs(store.root, exist_ok=True)
+    rollups = Rollups(rollups_path(store))
+    if rollups.articles is None or rollups.articles > len(store):
+        if rollups.db.execute("SELECT 1 FROM rollups LIMIT 1").fetchone():
+            logging.warning(f"{rollups.path} does not match {store.root}, rebuilding it")
+        rollups.clear()
+    for covered, articles in store.iter_batches(rollups.articles or 0):
+        rollups.add(articles, covered)
+    return rollups
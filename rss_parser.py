@@ -0,0 +1,109 @@
+import io
+import re
+
+from lxml import etree
+
+# Elements that delimit one article in RSS 0.9x/2.0, RSS 1.0 (RDF) and Atom
+ITEM_TAGS = {'item', 'entry'}
+
+# Child element local name -> (article field, preference rank).
+# When several children map to one field, the lowest rank wins.
+FIELD_TAGS = {
+    'title': ('title', 0),
+    'link': ('link', 0),
+    'pubDate': ('pubDate', 0),
+    'published': ('pubDate', 1),
+    'updated': ('pubDate', 2),
+    'date': ('pubDate', 3),
+    'description': ('description', 0),
+    'summary': ('description', 1),
+    'content': ('description', 2),
+}
+
+
+# RSS 2.0 <ttl>: minutes the channel may be cached before refreshing
+_TTL = re.compile(rb'<ttl>\s*(\d+)\s*</ttl>')
+
+
+def _local_name(tag):
+    """
+    Strips the '{namespace}' prefix lxml puts on qualified tag names.
+    """
+    if not isinstance(tag, str):
+        return None
+    return tag.rsplit('}', 1)[-1]
+
+
+def _atom_link(element):
+    """
+    Returns the href of an Atom <link>, or None for non-alternate links.
+    """
+    rel = element.get('rel', 'alternate')
+    if rel != 'alternate':
+        return None
+    return element.get('href')
+
+
+def _item_fields(item):
+    """
+    Extracts title/link/pubDate/description from one <item> or <entry>.
+    """
+    found = {}
+    for child in item:
+        mapping = FIELD_TAGS.get(_local_name(child.tag))
+        if mapping is None:
+            continue
+        field, rank = mapping
+        if field in found and found[field][0] <= rank:
+            continue
+        if field == 'link' and child.get('href') is not None:
+            value = _atom_link(child)
+        else:
+            value = (child.text or '').strip()
+        if value:
+            found[field] = (rank, value)
+    return {
+        'title': found['title'][1] if 'title' in found else '',
+        'link': found['link'][1] if 'link' in found else '',
+        'pubDate': found['pubDate'][1] if 'pubDate' in found else None,
+        'description': found['description'][1] if 'description' in found else '',
+    }
+
+
+def iter_feed_items(content):
+    """
+    Streams the items of an RSS or Atom feed given as bytes.
+
+    Yields one dict per <item>/<entry> with 'title', 'link', 'pubDate' and
+    'description'. Each element is cleared once it has been read, so memory
+    stays bounded by the size of a single item rather than the whole feed.
+    """
+    context = etree.iterparse(
+        io.BytesIO(content),
+        events=('end',),
+        recover=True,
+        resolve_entities=False,
+        no_network=True,
+    )
+    try:
+        for _, element in context:
+            if _local_name(element.tag) not in ITEM_TAGS:
+                continue
+            yield _item_fields(element)
+            # Free the item and any already-processed siblings
+            element.clear()
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+    except etree.XMLSyntaxError:
+        # Truncated or empty documents: keep whatever was parsed so far
+        return
+
+
+def feed_ttl(content):
+    """
+    Returns the feed's <ttl> hint in minutes, or None if it has none.
+    """
+    match = _TTL.search(content)
+    return int(match.group(1)) if match else None
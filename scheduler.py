@@ -0,0 +1,238 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+import config
+import metrics
+from atomic import write_atomic
+from daily_scraper import commit_articles, open_store
+from feed_cache import open_feed_cache
+from fetcher import fetch_feeds
+from rss_parser import feed_ttl
+from scrapper import add_sentiment, parse_feed_items
+from topics import get_matcher
+
+# Defaults used when config.py does not override them
+DEFAULT_SCHEDULE_FILE = "feed_schedule.json"
+DEFAULT_MIN_INTERVAL = 5 * 60  # Seconds
+DEFAULT_MAX_INTERVAL = 6 * 3600
+DEFAULT_INITIAL_INTERVAL = 30 * 60
+DEFAULT_TARGET_NEW = 1  # New articles a poll should find on average
+
+MAX_IDLE_SLEEP = 60  # Longest sleep between checks for due feeds, in seconds
+
+
+class FeedSchedule:
+    """
+    Per-feed polling state, persisted between runs.
+
+    For each feed it keeps the interval, the next due time, an
+    exponentially weighted rate of new articles per hour, the feed's <ttl>
+    hint and the number of consecutive errors. After each poll the interval
+    is recomputed so that a poll finds about POLL_TARGET_NEW new articles:
+    busy feeds are polled often, quiet ones back off towards
+    POLL_MAX_INTERVAL. The interval never goes below the feed's <ttl>, and
+    failing feeds back off exponentially.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or getattr(config, 'FEED_SCHEDULE_FILE', DEFAULT_SCHEDULE_FILE)
+        self.min_interval = getattr(config, 'POLL_MIN_INTERVAL', DEFAULT_MIN_INTERVAL)
+        self.max_interval = getattr(config, 'POLL_MAX_INTERVAL', DEFAULT_MAX_INTERVAL)
+        self.initial_interval = getattr(config, 'POLL_INITIAL_INTERVAL', DEFAULT_INITIAL_INTERVAL)
+        self.target_new = getattr(config, 'POLL_TARGET_NEW', DEFAULT_TARGET_NEW)
+        self.feeds = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.feeds = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable feed schedule {self.path}: {e}")
+
+    def state(self, url):
+        return self.feeds.setdefault(url, {
+            'interval': self.initial_interval,
+            'next_poll': 0,
+            'last_poll': None,
+            'rate': None,  # New articles per hour (EWMA)
+            'ttl': None,  # Minutes
+            'errors': 0,
+        })
+
+    def due(self, sources, now):
+        """
+        Returns the {source_name: url} subset of `sources` due for a poll.
+        """
+        return {name: url for name, url in sources.items() if self.state(url)['next_poll'] <= now}
+
+    def next_due(self, sources):
+        return min(self.state(url)['next_poll'] for url in sources.values())
+
+    def _clamp(self, interval, ttl=None):
+        if ttl:
+            interval = max(interval, ttl * 60)
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def record_success(self, url, new_articles, now, ttl=None, fetched=True):
+        """
+        Reschedules a feed after a poll that found `new_articles`. `ttl` is
+        the <ttl> of the body fetched; when nothing was fetched (not
+        `fetched`, e.g. a 304), the feed's previous <ttl> is kept.
+        """
+        state = self.state(url)
+        if state['last_poll'] is not None:
+            hours = max(now - state['last_poll'], 1) / 3600
+            observed = new_articles / hours
+            state['rate'] = observed if state['rate'] is None else 0.5 * state['rate'] + 0.5 * observed
+        if state['rate']:
+            interval = 3600 * self.target_new / state['rate']
+        elif state['last_poll'] is not None:
+            interval = state['interval'] * 2  # Nothing new yet: back off
+        else:
+            interval = state['interval']
+        if fetched:
+            state['ttl'] = ttl
+        state['errors'] = 0
+        state['last_poll'] = now
+        state['interval'] = self._clamp(interval, state['ttl'])
+        state['next_poll'] = now + state['interval']
+
+    def record_error(self, url, now):
+        state = self.state(url)
+        state['errors'] += 1
+        backoff = self.min_interval * 2 ** min(state['errors'], 10)
+        state['next_poll'] = now + self._clamp(max(state['interval'], backoff), state['ttl'])
+
+    def save(self):
+        write_atomic(self.path, lambda f: json.dump(self.feeds, f, indent=4))
+
+
+def poll_due_feeds(schedule, store, running_stats, near_dup_index, search_index, rollups, matcher, now=None):
+    """
+    Fetches the feeds that are due, commits their new articles to the store
+    and reschedules each feed. Returns (feeds polled, articles added).
+    """
+    now = now if now is not None else time.time()
+    due = schedule.due(config.NEWS_SOURCES, now)
+    if not due:
+        return 0, 0
+
+    by_source = {}
+    ttls = {}
+    failed = set()
+
+    def on_feed(source_name, content):
+        try:
+            by_source[source_name] = parse_feed_items(source_name, content, matcher)
+            ttls[source_name] = feed_ttl(content)
+        except Exception as e:
+            logging.error(f"Could not parse the feed of {source_name}: {e}")
+            failed.add(source_name)
+
+    logging.info(f"Polling {len(due)} of {len(config.NEWS_SOURCES)} feed(s)")
+    feed_cache = open_feed_cache()
+    fetch_feeds(due, on_feed, on_error=failed.add, cache=feed_cache)
+    if feed_cache:
+        # Fetch the failed feeds in full next time rather than getting a 304
+        for source_name in failed:
+            feed_cache.validators.pop(due[source_name], None)
+
+    articles = []
+    for source_name in due:
+        articles.extend(by_source.get(source_name, []))
+    fresh = store.unseen(articles)
+    if fresh:
+        add_sentiment(fresh, [article['title'] for article in fresh])
+        added = commit_articles(store, running_stats, near_dup_index, search_index, rollups, fresh)
+    else:
+        added = []
+    if feed_cache:
+        feed_cache.save()
+
+    new_by_source = {}
+    for article in added:
+        new_by_source[article['source']] = new_by_source.get(article['source'], 0) + 1
+    for source_name, url in due.items():
+        if source_name in failed:
+            schedule.record_error(url, now)
+        else:
+            schedule.record_success(url, new_by_source.get(source_name, 0), now, ttls.get(source_name),
+                                    fetched=source_name in ttls)
+    schedule.save()
+    return len(due), len(added)
+
+
+def _record_failed_poll(schedule):
+    """
+    Records an error for every feed that is due and saves the schedule.
+    Returns the number of feeds.
+    """
+    now = time.time()
+    due = schedule.due(config.NEWS_SOURCES, now)
+    for url in due.values():
+        schedule.record_error(url, now)
+    try:
+        schedule.save()
+    except OSError as e:
+        logging.error(f"Could not save the feed schedule {schedule.path}: {e}")
+    return len(due)
+
+
+def _close_indexes(*indexes):
+    for index in indexes:
+        if index is not None:
+            index.close()
+
+
+def run_daemon(once=False):
+    """
+    Polls each RSS feed on its own adaptive schedule (see FeedSchedule),
+    committing new articles as they arrive, until interrupted. With
+    `once`, polls whatever is due a single time and returns (for cron).
+    A poll that fails counts as an error for each feed it was polling, and
+    the store and its indexes are reopened so they catch up from disk.
+    """
+    if config.USE_NEWS_API:
+        logging.warning("Daemon mode polls the RSS feeds in config.NEWS_SOURCES; NewsAPI is not used")
+    store, running_stats, near_dup_index, search_index, rollups = open_store()
+    schedule = FeedSchedule()
+    matcher = get_matcher()
+    logging.info(f"Scheduling {len(config.NEWS_SOURCES)} feed(s), state in {schedule.path}")
+
+    try:
+        while True:
+            metrics.reset()
+            try:
+                polled, added = poll_due_feeds(
+                    schedule, store, running_stats, near_dup_index, search_index, rollups, matcher
+                )
+            except Exception as e:
+                logging.exception(f"Poll failed: {e}")
+                polled, added = _record_failed_poll(schedule), 0
+                try:
+                    _close_indexes(near_dup_index, search_index, rollups)
+                    store, running_stats, near_dup_index, search_index, rollups = open_store()
+                except Exception as e:
+                    logging.exception(f"Could not reopen the store: {e}")
+            if added:
+                logging.info(f"Committed {added} new article(s); {len(store)} in {store.root}")
+                metrics.write_run_metrics('poll')
+            if once:
+                return
+            next_due = schedule.next_due(config.NEWS_SOURCES)
+            if polled:
+                logging.info(f"Next feed due at {datetime.fromtimestamp(next_due).strftime('%H:%M:%S')}")
+            wait = next_due - time.time()
+            if wait > 0:
+                time.sleep(min(wait, MAX_IDLE_SLEEP))
+    except KeyboardInterrupt:
+        logging.info("Stopping scheduler")
+        schedule.save()
+
+
+if __name__ == "__main__":
+    import sys
+
+    run_daemon(once='--once' in sys.argv[1:])
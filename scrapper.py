@@ -1,42 +1,47 @@
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-import pytz
 import json
 import logging
-from textblob import TextBlob
 import sys
+import time
 import os
 
 # Add current directory to path to ensure local config is imported
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import checkpoint
 import config
+import metrics
+from article import Article, to_json
+from atomic import write_atomic
+from dates import parse_pub_date
+from dedup import DedupIndex
+from topics import get_matcher
+
+# Defaults used when config.py does not override them
+DEFAULT_SCRAPE_FEED_CACHE_FILE = "feed_cache_scrape.json"
+
+# Network, parsing and NLP dependencies (requests, lxml, bs4, TextBlob/NLTK)
+# are imported inside the functions that use them, so importing this module
+# (e.g. from daily_scraper or the CLI) stays cheap.
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def is_within_date_range(pub_date_str):
+def is_within_date_range(pub_date_str, pub_timestamp=None):
     """
-    Checks if an article's publication date is within the last 12 years.
+    Checks if an article's publication date is within the last DATE_RANGE_YEARS years.
+    Pass `pub_timestamp` when the date has already been parsed.
     """
-    if not pub_date_str:
-        return False
-        
-    try:
-        pub_date = datetime.strptime(pub_date_str, '%a, %d %b %Y %H:%M:%S %z')
-    except ValueError:
-        try:
-            pub_date = datetime.strptime(pub_date_str, '%a, %d %b %Y %H:%M:%S %Z')
-        except ValueError:
+    if pub_timestamp is None:
+        if not pub_date_str:
+            return False
+        pub_timestamp = parse_pub_date(pub_date_str)
+        if pub_timestamp is None:
             logging.warning(f"Could not parse date: {pub_date_str}")
             return False
-
-    if pub_date.tzinfo is None:
-        pub_date = pub_date.replace(tzinfo=pytz.UTC)
-        
-    twelve_years_ago = datetime.now(pub_date.tzinfo) - timedelta(days=365 * config.DATE_RANGE_YEARS)
     
-    return pub_date > twelve_years_ago
+    cutoff = time.time() - timedelta(days=365 * config.DATE_RANGE_YEARS).total_seconds()
+    
+    return pub_timestamp > cutoff
 
 def analyze_sentiment(text):
     """
@@ -45,35 +50,37 @@ def analyze_sentiment(text):
     
     Polarity: ranges from -1 (negative) to 1 (positive)
     Subjectivity: ranges from 0 (objective) to 1 (subjective)
-    """
-    blob = TextBlob(text)
-    polarity = blob.sentiment.polarity
-    subjectivity = blob.sentiment.subjectivity
     
-    # Categorize sentiment
-    if polarity > 0.1:
-        sentiment_label = "positive"
-    elif polarity < -0.1:
-        sentiment_label = "negative"
-    else:
-        sentiment_label = "neutral"
+    Scrapers score whole batches with sentiment.analyze_batch instead.
+    """
+    from sentiment import score_text
+    return score_text(text)
+
+def add_sentiment(articles, texts):
+    """
+    Batch-scores `texts` and stores each result on the matching article.
+    """
+    from sentiment import analyze_batch
     
-    return {
-        "polarity": round(polarity, 3),
-        "subjectivity": round(subjectivity, 3),
-        "label": sentiment_label
-    }
+    for article, sentiment in zip(articles, analyze_batch(texts)):
+        article['sentiment'] = sentiment
+    return articles
 
 def scrape_with_newsapi():
     """
-    Fetches articles using NewsAPI for historical data access with pagination.
+    Fetches articles using NewsAPI for historical data access, one query per day window.
     """
+    import http_client
+    from newsapi_fetcher import fetch_newsapi_articles
+    
     if not config.NEWS_API_KEY or config.NEWS_API_KEY == "YOUR_API_KEY_HERE":
         logging.error("NewsAPI key not configured. Please set NEWS_API_KEY in config.py")
         logging.info("Get your free API key from: https://newsapi.org/register")
         return []
     
     all_articles = []
+    texts_to_analyze = []
+    seen_links = DedupIndex()
     logging.info("Fetching articles from NewsAPI...")
     
     # Calculate date range - Free tier only allows 30 days
@@ -88,141 +95,215 @@ def scrape_with_newsapi():
     if config.DATE_RANGE_YEARS > 1/12:  # More than 1 month
         logging.warning(f"Requested {config.DATE_RANGE_YEARS} years, but free tier only allows 30 days")
     
-    # NewsAPI endpoint
-    url = "https://newsapi.org/v2/everything"
-    
-    # Calculate number of pages needed
-    page_size = 100  # Max per request
+    # Day windows and their pages are fetched concurrently within the daily quota
     max_articles = getattr(config, 'MAX_ARTICLES', 300)
-    total_pages = min(3, (max_articles + page_size - 1) // page_size)  # Max 3 pages to avoid rate limits
+    logging.info(f"Will fetch up to {max_articles} articles")
+    matcher = get_matcher()
+    raw_articles = fetch_newsapi_articles(start_date, end_date, max_articles)
     
-    for page in range(1, total_pages + 1):
-        logging.info(f"Fetching page {page}/{total_pages}...")
-        
-        params = {
-            'q': config.SEARCH_QUERY,
-            'domains': getattr(config, 'NEWS_API_DOMAINS', None),
-            'from': from_date,
-            'to': to_date,
-            'language': 'en',
-            'sortBy': 'publishedAt',
-            'pageSize': page_size,
-            'page': page,
-            'apiKey': config.NEWS_API_KEY
-        }
-        
-        # Remove None values
-        params = {k: v for k, v in params.items() if v is not None}
-        
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+    with metrics.span('filter', items=len(raw_articles)) as span:
+        for article in raw_articles:
+            title = article.get('title', '')
+            description = article.get('description', '')
             
-            if data['status'] == 'ok':
-                if page == 1:
-                    logging.info(f"Total available: {data['totalResults']} articles")
-                    logging.info(f"Will fetch up to {max_articles} articles")
-                
-                articles_in_page = len(data['articles'])
-                logging.info(f"Retrieved {articles_in_page} articles from page {page}")
-                
-                if articles_in_page == 0:
-                    logging.info("No more articles available")
-                    break
-                
-                for article in data['articles']:
-                    title = article.get('title', '')
-                    description = article.get('description', '')
-                    
-                    # Skip if already added (deduplication)
-                    if any(a['link'] == article.get('url', '') for a in all_articles):
-                        continue
-                    
-                    # Analyze sentiment on title (or title + description)
-                    text_to_analyze = f"{title}. {description}" if description else title
-                    sentiment = analyze_sentiment(text_to_analyze)
-                    
-                    all_articles.append({
-                        'source': article['source']['name'],
-                        'title': title,
-                        'description': description,
-                        'link': article.get('url', ''),
-                        'pubDate': article.get('publishedAt', ''),
-                        'author': article.get('author', ''),
-                        'sentiment': sentiment
-                    })
-                    
-                    if len(all_articles) >= max_articles:
-                        logging.info(f"Reached maximum of {max_articles} articles")
-                        break
-                
-                if len(all_articles) >= max_articles:
-                    break
-                    
-            else:
-                logging.error(f"NewsAPI error: {data.get('message', 'Unknown error')}")
+            # Skip if already added (deduplication on canonical URL)
+            if not seen_links.add(article.get('url', '')):
+                continue
+            
+            # Sentiment is scored on title (or title + description) in one batch below
+            texts_to_analyze.append(f"{title}. {description}" if description else title)
+            
+            all_articles.append(Article(
+                source=article['source']['name'],
+                title=title,
+                description=description,
+                link=article.get('url', ''),
+                pubDate=article.get('publishedAt', ''),
+                pubTimestamp=parse_pub_date(article.get('publishedAt')),
+                author=article.get('author', ''),
+                # NewsAPI matched the full text; tag the topics visible in title/description
+                topics=matcher.match(f"{title} {description or ''}")
+            ))
+            
+            if len(all_articles) >= max_articles:
+                logging.info(f"Reached maximum of {max_articles} articles")
                 break
-                
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Error fetching from NewsAPI: {e}")
-            break
+        
+        span.add(articles=len(all_articles))
     
     logging.info(f"Total articles fetched: {len(all_articles)}")
+    http_client.log_latency_summary()
+    add_sentiment(all_articles, texts_to_analyze)
     return all_articles
 
-def scrape_news_sources():
+def _iter_items_bs4(content):
     """
-    Scrapes articles from the configured RSS feeds, filters them, and saves them to a JSON file.
+    Yields (title, link, pubDate) for each <item> using a full BeautifulSoup tree.
+    """
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(content, 'xml')
+    
+    for item in soup.find_all('item'):
+        title = item.find('title').text
+        link = item.find('link').text if item.find('link') else ''
+        pub_date_str = item.find('pubDate').text if item.find('pubDate') else None
+        yield title, link, pub_date_str
+
+def _iter_items_lxml(content):
+    """
+    Yields (title, link, pubDate) for each RSS <item> or Atom <entry>, streaming.
+    """
+    from rss_parser import iter_feed_items
+    
+    for item in iter_feed_items(content):
+        yield item['title'], item['link'], item['pubDate']
+
+def parse_feed_items(source_name, content, matcher=None):
     """
+    Parses one RSS feed and returns the articles whose title matches at least
+    one configured topic, tagged with every topic they matched.
+    config.RSS_PARSER selects the streaming 'lxml' parser (default) or 'bs4'.
+    """
+    if matcher is None:
+        matcher = get_matcher()
+    
+    if getattr(config, 'RSS_PARSER', 'lxml') == 'bs4':
+        items = _iter_items_bs4(content)
+    else:
+        items = _iter_items_lxml(content)
+    
+    # Items are filtered as the parser yields them, so the feed is never
+    # held in memory as a whole; filtering is timed as part of 'parse'
     articles = []
+    count = 0
+    with metrics.span('parse', bytes=len(content)) as span:
+        for title, link, pub_date_str in items:
+            count += 1
+            topics = matcher.match(title)
+            if not topics:
+                continue
+            # Dates are parsed once here and stored on the article
+            pub_timestamp = parse_pub_date(pub_date_str)
+            if is_within_date_range(pub_date_str, pub_timestamp):
+                # Sentiment is added later, in one batch across all feeds
+                articles.append(Article(
+                    source=source_name,
+                    title=title,
+                    link=link,
+                    pubDate=pub_date_str,
+                    pubTimestamp=pub_timestamp,
+                    topics=topics
+                ))
+        span.add(items=count, articles=len(articles))
+    
+    return articles
+
+def scrape_news_sources(feed_cache=None, previous=None):
+    """
+    Scrapes articles from the configured RSS feeds concurrently and filters them.
+    Feeds are parsed as they arrive; results keep the order of config.NEWS_SOURCES.
+    During a checkpointed run (see checkpoint.py) each parsed feed is saved,
+    and feeds saved by an interrupted run are not fetched again.
+
+    With a FeedCache, unchanged feeds are skipped: they contribute the
+    articles `previous` ({source name: articles}) holds for them, or none
+    when the caller already stored them (e.g. in the historical store).
+    The caller saves the cache once the articles are stored.
+    """
+    import http_client
+    from fetcher import fetch_feeds
+    
     logging.info("Starting scraper...")
-    for source_name, rss_url in config.NEWS_SOURCES.items():
-        logging.info(f"Scraping {source_name}...")
-        try:
-            response = requests.get(rss_url)
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Error fetching RSS feed from {rss_url}: {e}")
-            continue
-
-        soup = BeautifulSoup(response.content, 'xml')
-        
-        items = soup.find_all('item')
-        
-        for item in items:
-            title = item.find('title').text
-            link = item.find('link').text if item.find('link') else ''
-            pub_date_str = item.find('pubDate').text if item.find('pubDate') else None
-            
-            if config.SEARCH_QUERY.lower() in title.lower() and is_within_date_range(pub_date_str):
-                # Perform sentiment analysis on the title
-                sentiment = analyze_sentiment(title)
-                
-                articles.append({
-                    'source': source_name,
-                    'title': title,
-                    'link': link,
-                    'pubDate': pub_date_str,
-                    'sentiment': sentiment
-                })
+    by_source = {}
+    matcher = get_matcher()
+    run = checkpoint.current()
+    
+    pending = {}
+    for source_name, url in config.NEWS_SOURCES.items():
+        saved = run.load_feed(source_name, url) if run else None
+        if saved is not None:
+            by_source[source_name] = saved
+        else:
+            pending[source_name] = url
+    if len(pending) < len(config.NEWS_SOURCES):
+        logging.info(f"Reusing {len(config.NEWS_SOURCES) - len(pending)} feed(s) checkpointed by the interrupted run")
+        metrics.add('fetch', resumed=len(config.NEWS_SOURCES) - len(pending))
+    
+    def on_feed(source_name, content):
+        by_source[source_name] = parse_feed_items(source_name, content, matcher)
+        if run:
+            run.save_feed(source_name, config.NEWS_SOURCES[source_name], by_source[source_name])
     
+    def on_not_modified(source_name):
+        by_source[source_name] = (previous or {}).get(source_name, [])
+    
+    fetch_feeds(pending, on_feed, cache=feed_cache, on_not_modified=on_not_modified)
+    
+    articles = []
+    for source_name in config.NEWS_SOURCES:
+        articles.extend(by_source.get(source_name, []))
+    
+    http_client.log_latency_summary()
+    # Perform sentiment analysis on the titles
+    add_sentiment(articles, [article['title'] for article in articles])
     return articles
 
 def save_articles(articles):
     """
-    Saves articles to JSON file.
+    Saves articles to JSON file (temp file + rename).
     """
-    with open(config.OUTPUT_FILE, 'w') as f:
-        json.dump(articles, f, indent=4)
+    with metrics.span('save', articles=len(articles)) as span:
+        def write(f):
+            json.dump(articles, f, indent=4, default=to_json)
+            span.add(bytes=f.tell())
+        write_atomic(config.OUTPUT_FILE, write)
         
     logging.info(f"Scraped {len(articles)} articles and saved them to {config.OUTPUT_FILE}")
     logging.info("Scraper finished.")
 
-if __name__ == "__main__":
+def load_previous_output():
+    """
+    Returns the articles of the last OUTPUT_FILE by source, or None if
+    there is no readable one.
+    """
+    from json_stream import iter_json_array
+    
+    if not os.path.exists(config.OUTPUT_FILE):
+        return None
+    by_source = {}
+    try:
+        for article in iter_json_array(config.OUTPUT_FILE):
+            by_source.setdefault(article.get('source'), []).append(Article.from_dict(article))
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable {config.OUTPUT_FILE}: {e}")
+        return None
+    return by_source
+
+def main():
+    """
+    One-time scrape: fetches, scores and saves articles to OUTPUT_FILE.
+    Feeds unchanged since the last scrape keep their articles from the
+    previous OUTPUT_FILE.
+    """
     if config.USE_NEWS_API:
         articles = scrape_with_newsapi()
+        save_articles(articles)
     else:
-        articles = scrape_news_sources()
+        from feed_cache import open_feed_cache
+        
+        feed_cache = open_feed_cache(getattr(config, 'SCRAPE_FEED_CACHE_FILE', DEFAULT_SCRAPE_FEED_CACHE_FILE))
+        previous = load_previous_output()
+        if feed_cache and previous is None:
+            # Nothing to fall back on for unchanged feeds: fetch them all
+            feed_cache.validators = {}
+        articles = scrape_news_sources(feed_cache, previous)
+        save_articles(articles)
+        if feed_cache:
+            feed_cache.save()
     
-    save_articles(articles)
+    metrics.log_summary()
+    metrics.write_run_metrics('scrape')
+
+if __name__ == "__main__":
+    main()
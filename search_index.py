@@ -0,0 +1,208 @@
+import logging
+import os
+import re
+import sqlite3
+
+from dates import article_timestamp
+
+INDEX_FILE = "search_index.sqlite3"
+
+DEFAULT_LIMIT = 20  # Results per query
+TITLE_WEIGHT = 3.0  # BM25 weight of a title match relative to a description match
+
+# Quoted phrases, or single words (optionally with a trailing * for prefix search)
+_QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+_WORD = re.compile(r'\w+')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    source TEXT,
+    title TEXT,
+    description TEXT,
+    link TEXT,
+    pubDate TEXT,
+    ts INTEGER,
+    label TEXT
+);
+CREATE INDEX IF NOT EXISTS docs_ts ON docs (ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5(
+    title, description,
+    content='docs', content_rowid='id',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+"""
+
+
+def fts_query(text):
+    """
+    Turns a search box query into an FTS5 query: "quoted phrases" match
+    exactly (after stemming), other words are ANDed, and a trailing *
+    makes a word a prefix. Punctuation never reaches FTS5 as syntax.
+    Returns None if the query has no words.
+    """
+    parts = []
+    for match in _QUERY_PART.finditer(text):
+        phrase, word = match.groups()
+        if phrase is not None:
+            words = _WORD.findall(phrase)
+            if words:
+                parts.append('"' + ' '.join(words) + '"')
+        else:
+            terms = [f'"{term}"' for term in _WORD.findall(word)]
+            if terms and word.endswith('*'):
+                terms[-1] += '*'
+            parts.extend(terms)
+    return ' '.join(parts) or None
+
+
+class SearchIndex:
+    """
+    Persistent inverted index over article titles and descriptions.
+
+    An SQLite FTS5 table holds the postings; a plain table next to it keeps
+    the source, link, publish time and sentiment label of each article, so
+    a query is answered from the index alone: the JSONL segments and the
+    JSON archives are never read. Results are ranked by BM25 with title
+    matches weighted TITLE_WEIGHT times higher than description matches.
+
+    Like the near-duplicate index, it records how many store articles it
+    covers, and articles plus that count are committed in one transaction.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        try:
+            self.db.executescript(_SCHEMA)
+        except sqlite3.Error:
+            self.db.close()
+            raise
+
+    @property
+    def articles(self):
+        """
+        Number of store articles covered, or None if not recorded.
+        """
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'articles'").fetchone()
+        return row[0] if row else None
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def add(self, articles, covered):
+        """
+        Indexes `articles` and records that the index now covers the first
+        `covered` store articles, atomically.
+        """
+        with self.db:
+            first = self.db.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM docs").fetchone()[0]
+            rows = [
+                (
+                    first + n,
+                    article.get('source'),
+                    article.get('title') or '',
+                    article.get('description') or '',
+                    article.get('link'),
+                    article.get('pubDate'),
+                    article_timestamp(article),
+                    (article.get('sentiment') or {}).get('label'),
+                )
+                for n, article in enumerate(articles)
+            ]
+            self.db.executemany(
+                "INSERT INTO docs (id, source, title, description, link, pubDate, ts, label)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.db.executemany(
+                "INSERT INTO search (rowid, title, description) VALUES (?, ?, ?)",
+                [(row[0], row[2], row[3]) for row in rows],
+            )
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('articles', ?)", (covered,))
+
+    def clear(self):
+        with self.db:
+            self.db.execute("INSERT INTO search (search) VALUES ('delete-all')")
+            self.db.execute("DELETE FROM docs")
+            self.db.execute("DELETE FROM meta WHERE key IN ('articles', 'segments')")
+
+    def search(self, query, source=None, start=None, end=None, label=None, limit=DEFAULT_LIMIT):
+        """
+        Returns up to `limit` matching articles as dicts (source, title,
+        link, pubDate, label), best match first; equally ranked articles
+        are returned most recently collected first.
+
+        `query` is parsed by fts_query(). `source` and `label` must match
+        exactly; `start` / `end` (aware datetimes) bound the publish time.
+        """
+        match = fts_query(query)
+        if match is None:
+            return []
+        filters = []
+        params = [match]
+        if source:
+            filters.append("docs.source = ?")
+            params.append(source)
+        if label:
+            filters.append("docs.label = ?")
+            params.append(label)
+        if start:
+            filters.append("docs.ts >= ?")
+            params.append(int(start.timestamp()))
+        if end:
+            filters.append("docs.ts <= ?")
+            params.append(int(end.timestamp()))
+        params.append(limit)
+
+        # Rank inside FTS5 and join the metadata of the top `limit` rows
+        # only; filters need the metadata of every match, so they join first.
+        # Ties (e.g. the same wire story) go to the newest row: rows are
+        # added in collection order.
+        hits = (
+            f"SELECT search.rowid AS id, bm25(search, {TITLE_WEIGHT}, 1.0) AS score FROM search"
+            + (" JOIN docs ON docs.id = search.rowid" if filters else "")
+            + " WHERE search MATCH ?"
+            + "".join(f" AND {condition}" for condition in filters)
+            + " ORDER BY score, search.rowid DESC LIMIT ?"
+        )
+        sql = (
+            "SELECT docs.source, docs.title, docs.link, docs.pubDate, docs.label"
+            f" FROM ({hits}) AS hits JOIN docs ON docs.id = hits.id"
+            " ORDER BY hits.score, hits.id DESC"
+        )
+
+        keys = ('source', 'title', 'link', 'pubDate', 'label')
+        return [dict(zip(keys, row)) for row in self.db.execute(sql, params)]
+
+    def close(self):
+        self.db.close()
+
+
+def index_path(store):
+    return os.path.join(store.root, INDEX_FILE)
+
+
+def open_search_index(store):
+    """
+    Opens the search index for `store` and indexes any committed articles
+    it does not cover yet (e.g. after an import or when the index was
+    deleted), reading only the segments that hold them. An index that
+    claims more articles than the store has, or that predates article
+    counts, is rebuilt. Returns None, as with SEARCH_ENABLED off, if this
+    Python's SQLite has no FTS5.
+    """
+    os.makedirs(store.root, exist_ok=True)
+    try:
+        index = SearchIndex(index_path(store))
+    except sqlite3.OperationalError as e:  # "no such module: fts5"
+        logging.warning(f"Full-text search is unavailable, not indexing {store.root}: {e}")
+        return None
+    if index.articles is None or index.articles > len(store):
+        if len(index):
+            logging.warning(f"{index.path} does not match {store.root}, rebuilding it")
+        index.clear()
+    for covered, articles in store.iter_batches(index.articles or 0):
+        index.add(articles, covered)
+    return index
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import checkpoint
+import config
+import metrics
+from atomic import write_atomic
+
+# Defaults used when config.py does not override them
+DEFAULT_SENTIMENT_CACHE_FILE = "sentiment_cache.json"
+DEFAULT_SENTIMENT_CACHE_SIZE = 100000
+DEFAULT_SENTIMENT_WORKERS = None  # None = one per CPU core
+DEFAULT_SENTIMENT_PARALLEL_MIN = 64  # Smaller batches are scored in-process
+
+
+def label_for(polarity):
+    """
+    Categorizes a polarity score as positive, negative or neutral.
+    """
+    if polarity > 0.1:
+        return "positive"
+    elif polarity < -0.1:
+        return "negative"
+    return "neutral"
+
+
+def _scores(text):
+    """
+    Returns (polarity, subjectivity) for `text`, rounded to 3 places.
+    Top-level so it can run in worker processes.
+    """
+    from textblob import TextBlob  # Imported on first use: TextBlob pulls in NLTK
+
+    sentiment = TextBlob(text).sentiment
+    return round(sentiment.polarity, 3), round(sentiment.subjectivity, 3)
+
+
+def _as_dict(scores):
+    polarity, subjectivity = scores
+    return {
+        "polarity": polarity,
+        "subjectivity": subjectivity,
+        "label": label_for(polarity)
+    }
+
+
+def score_text(text):
+    """
+    Analyzes the sentiment of a single text using TextBlob.
+
+    Polarity: ranges from -1 (negative) to 1 (positive)
+    Subjectivity: ranges from 0 (objective) to 1 (subjective)
+    """
+    return _as_dict(_scores(text))
+
+
+def text_key(text):
+    """
+    Content hash used to dedupe texts and key the memo cache.
+    """
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class SentimentCache:
+    """
+    Persistent, size-bounded memo of sentiment scores keyed by content hash.
+    Least recently used entries are evicted once `max_size` is exceeded.
+    """
+
+    def __init__(self, path=None, max_size=None):
+        self.path = path or getattr(config, 'SENTIMENT_CACHE_FILE', DEFAULT_SENTIMENT_CACHE_FILE)
+        self.max_size = max_size or getattr(config, 'SENTIMENT_CACHE_SIZE', DEFAULT_SENTIMENT_CACHE_SIZE)
+        self.entries = OrderedDict()
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = OrderedDict((k, tuple(v)) for k, v in json.load(f).items())
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable sentiment cache {self.path}: {e}")
+            self.entries = OrderedDict()
+
+    def get(self, key):
+        scores = self.entries.get(key)
+        if scores is not None:
+            self.entries.move_to_end(key)
+        return scores
+
+    def put(self, key, scores):
+        self.entries[key] = scores
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        self._dirty = True
+
+    def save(self):
+        """
+        Writes the cache atomically (temp file + rename) if it changed.
+        """
+        if not self._dirty:
+            return
+        write_atomic(self.path, lambda f: json.dump(self.entries, f, separators=(',', ':')))
+        self._dirty = False
+
+
+def _score_cold(texts):
+    """
+    Scores texts that missed the cache, using a process pool for large
+    batches. Yields the scores in order as they come in.
+    """
+    parallel_min = getattr(config, 'SENTIMENT_PARALLEL_MIN', DEFAULT_SENTIMENT_PARALLEL_MIN)
+    if len(texts) < parallel_min:
+        yield from map(_scores, texts)
+        return
+
+    workers = getattr(config, 'SENTIMENT_WORKERS', DEFAULT_SENTIMENT_WORKERS) or os.cpu_count() or 1
+    chunksize = max(1, len(texts) // (workers * 4))
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for scores in executor.map(_scores, texts, chunksize=chunksize):
+                yield scores
+                done += 1
+    except (OSError, BrokenProcessPool) as e:
+        logging.warning(f"Process pool unavailable ({e}), scoring in-process")
+        yield from map(_scores, texts[done:])
+
+
+def analyze_batch(texts, cache=None):
+    """
+    Scores a batch of texts and returns one sentiment dict per input text.
+
+    Identical texts are scored once, previously seen texts come from the
+    persistent cache, and the remaining ones are fanned out across CPU cores.
+    During a checkpointed run (see checkpoint.py), new scores are also
+    saved to the run directory as they come in, and scores saved by an
+    interrupted run are reused.
+    """
+    with metrics.span('sentiment', texts=len(texts)) as span:
+        return _analyze_batch(texts, cache, span)
+
+
+def _analyze_batch(texts, cache, span):
+    own_cache = cache is None
+    if own_cache:
+        cache = SentimentCache()
+
+    run = checkpoint.current()
+    resumed = run.scores() if run else {}
+    keys = [text_key(text) for text in texts]
+    results = {}
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key in results or key in pending:
+            continue
+        scores = cache.get(key)
+        if scores is None and key in resumed:
+            scores = resumed[key]
+            cache.put(key, scores)
+        if scores is not None:
+            results[key] = scores
+        else:
+            pending[key] = text
+    cold_keys = list(pending)
+    cold_texts = list(pending.values())
+
+    every = getattr(config, 'RUN_CHECKPOINT_TEXTS', checkpoint.DEFAULT_RUN_CHECKPOINT_TEXTS)
+    scored = []
+    for key, scores in zip(cold_keys, _score_cold(cold_texts)):
+        results[key] = scores
+        cache.put(key, scores)
+        if run:
+            scored.append((key, scores))
+            if len(scored) >= every:
+                run.save_scores(scored)
+                scored = []
+    if scored:
+        run.save_scores(scored)
+
+    logging.info(
+        f"Sentiment: {len(texts)} texts, {len(results)} unique, "
+        f"{len(results) - len(cold_keys)} cached, {len(cold_keys)} scored"
+    )
+    span.add(cached=len(results) - len(cold_keys), scored=len(cold_keys))
+
+    if own_cache:
+        cache.save()
+
+    return [_as_dict(results[key]) for key in keys]
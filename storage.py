@@ -0,0 +1,463 @@
+import gzip
+import itertools
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timezone
+
+import config
+from article import Article, to_json
+from atomic import copy_atomic, write_atomic, write_atomic_gzip
+from columns import COLUMNS_DIR, append_columns, complete_rows
+from dates import article_timestamp, format_day, normalize_dates
+from dedup import DedupIndex, canonicalize_url
+from json_stream import iter_json_array
+
+# Defaults used when config.py does not override them
+DEFAULT_HISTORY_DIR = "history"
+IMPORT_SEGMENT_SIZE = 10000  # Articles per segment when importing a JSON archive
+
+MANIFEST_FILE = "manifest.json"
+MERGING = "-merging"  # Name suffix of partitions that reseal() rewrites, until renamed back
+
+
+def _columns_enabled():
+    return getattr(config, 'COLUMNS_ENABLED', True)
+
+
+def _month(ts):
+    return format_day(ts)[:7]
+
+
+class ArticleStore:
+    """
+    Append-only article archive made of immutable JSON Lines segments.
+
+    Each append writes one new segment plus a sidecar of canonical links,
+    then commits it by atomically rewriting a small manifest. A crash before
+    the manifest is replaced leaves the archive exactly as it was.
+
+    The manifest records each segment's article count and publish-time
+    bounds, so time-range reads only open the segments that overlap. The
+    link sidecars form the dedup index without parsing any articles.
+
+    Once a month is over, compact() seals its daily segments into one
+    gzip partition per month (YYYY-MM.jsonl.gz plus YYYY-MM.links.gz),
+    which is never rewritten again. Only the open month stays as small
+    plain segments, so a daily run writes (and a git commit of the store
+    diffs) only the current month. Sealing keeps the order of articles;
+    late articles of a sealed month go into an extra partition
+    (YYYY-MM-2.jsonl.gz, ...) until reseal() merges it by hand.
+
+    The store also appends every article to fixed-width column files (see
+    columns.py) before the same manifest commit. The files' own length
+    tells how many articles they cover (the manifest does not record it),
+    so files that are missing or short are caught up from the store.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or getattr(config, 'HISTORY_DIR', DEFAULT_HISTORY_DIR)
+        self.manifest = self._load_manifest()
+        self._index = None
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _load_manifest(self):
+        path = self._path(MANIFEST_FILE)
+        if not os.path.exists(path):
+            return {'version': 1, 'segments': []}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _open(self, name):
+        path = self._path(name)
+        if name.endswith('.gz'):
+            return gzip.open(path, 'rt', encoding='utf-8')
+        return open(path, 'r', encoding='utf-8')
+
+    def _commit(self, manifest):
+        # Replacing the manifest is the commit point
+        write_atomic(self._path(MANIFEST_FILE), lambda f: json.dump(manifest, f, indent=4))
+        self.manifest = manifest
+
+    def __len__(self):
+        return sum(segment['count'] for segment in self.manifest['segments'])
+
+    @property
+    def index(self):
+        """
+        DedupIndex of every stored link, loaded lazily from the link sidecars.
+        """
+        if self._index is None:
+            self._index = DedupIndex()
+            for segment in self.manifest['segments']:
+                with self._open(segment['links']) as f:
+                    self._index.keys.update(line.rstrip('\n') for line in f)
+        return self._index
+
+    def unseen(self, articles):
+        """
+        Returns the articles that append() would store: links not stored
+        yet, first occurrence only. The store itself is left unchanged.
+        """
+        index = self.index
+        seen = set()
+        fresh = []
+        for article in articles:
+            key = canonicalize_url(article.get('link', ''))
+            if key not in index.keys and key not in seen:
+                seen.add(key)
+                fresh.append(article)
+        return fresh
+
+    def append(self, articles):
+        """
+        Appends the articles whose canonical link is not stored yet and
+        commits them atomically. Returns the list of articles added.
+        """
+        index = self.index
+        normalize_dates(articles)
+        added = [article for article in articles if index.add(article.get('link', ''))]
+        duplicates = len(articles) - len(added)
+
+        if added:
+            self.sync_columns()
+            self._write_segment(added)
+        logging.info(f"Added {len(added)} new articles, skipped {duplicates} duplicates")
+        return added
+
+    def _write_segment(self, articles):
+        os.makedirs(self.root, exist_ok=True)
+        number = self.manifest.get('next_segment', len(self.manifest['segments']) + 1)
+        name = f"segment-{number:06d}.jsonl"
+        links = f"segment-{number:06d}.links"
+
+        def write_articles(f):
+            for article in articles:
+                f.write(json.dumps(article, ensure_ascii=False, default=to_json))
+                f.write('\n')
+
+        def write_links(f):
+            for article in articles:
+                f.write(canonicalize_url(article.get('link', '')))
+                f.write('\n')
+
+        write_atomic(self._path(name), write_articles)
+        write_atomic(self._path(links), write_links)
+        if _columns_enabled() and self._column_rows() == len(self):
+            append_columns(self.root, articles, len(self))
+
+        timestamps = [ts for ts in map(article_timestamp, articles) if ts is not None]
+        segment = {
+            'name': name,
+            'links': links,
+            'count': len(articles),
+            'oldest': min(timestamps) if timestamps else None,
+            'newest': max(timestamps) if timestamps else None,
+        }
+        manifest = dict(
+            self.manifest,
+            segments=self.manifest['segments'] + [segment],
+            next_segment=number + 1,
+        )
+        for key in ('column_rows', 'columns'):  # Column coverage recorded by older stores
+            manifest.pop(key, None)
+        self._commit(manifest)
+
+    def compact(self, now=None):
+        """
+        Seals the plain segments of every month before the current UTC
+        month into one gzip partition per run of consecutive segments of
+        that month. A segment belongs to the month of its newest article
+        (undated segments follow the segment before them). Partitions are
+        written once: late segments of a sealed month get a partition of
+        their own (YYYY-MM-2.jsonl.gz, ...) until reseal() merges them.
+        Returns the number of partitions written.
+        """
+        current = _month((now or datetime.now(timezone.utc)).timestamp())
+        segments = self.manifest['segments']
+        groups = []  # [month, first index, last index + 1]
+        month = None
+        for i, segment in enumerate(segments):
+            if segment.get('sealed'):
+                month = None
+                continue
+            if segment['newest'] is not None:
+                month = _month(segment['newest'])
+            if month is None or month >= current:
+                continue
+            if groups and groups[-1][0] == month and groups[-1][2] == i:
+                groups[-1][2] = i + 1
+            else:
+                groups.append([month, i, i + 1])
+        return self._seal(groups)
+
+    def reseal(self):
+        """
+        Merges the extra partitions that compact() starts for late articles
+        (YYYY-MM-2.jsonl.gz, ...) into their month's partition. This moves
+        their articles before the ones stored in between, so the column
+        files are rebuilt; the other derived indexes only hold sets of
+        articles and stay valid if they cover the whole store, so run it
+        between collection runs. A month's partition is rewritten under a
+        temporary name and copied back once committed; if that is cut
+        short, running reseal() again finishes it. Returns the number of
+        partitions written.
+        """
+        segments = self.manifest['segments']
+        order = []
+        by_month = {}
+        for segment in segments:
+            if not segment.get('sealed'):
+                order.append([segment])
+            elif segment['name'][:7] in by_month:
+                by_month[segment['name'][:7]].append(segment)
+            else:
+                by_month[segment['name'][:7]] = [segment]
+                order.append(by_month[segment['name'][:7]])
+        reordered = [segment for run in order for segment in run]
+        if reordered != segments:
+            logging.info(f"Moving the late partitions of {self.root} next to their month")
+            # Deleted first, so a crash leaves them to be rebuilt rather than misaligned
+            shutil.rmtree(self._path(COLUMNS_DIR), ignore_errors=True)
+            self._commit(dict(self.manifest, segments=reordered))
+            self.sync_columns()
+
+        groups = []
+        for i, segment in enumerate(reordered):
+            if not segment.get('sealed'):
+                continue
+            month = segment['name'][:7]
+            if groups and groups[-1][0] == month and groups[-1][2] == i:
+                groups[-1][2] = i + 1
+            else:
+                groups.append([month, i, i + 1])
+        groups = [group for group in groups
+                  if group[2] - group[1] > 1 or reordered[group[1]]['name'].endswith(f"{MERGING}.jsonl.gz")]
+        return self._seal(groups)
+
+    def _seal(self, groups):
+        """
+        Writes each [month, first, last] run of manifest entries as one
+        gzip partition and commits them with the manifest before the files
+        they replace are deleted. A partition that must take the name of
+        one it replaces is written under a temporary name first.
+        """
+        if not groups:
+            return 0
+        segments = self.manifest['segments']
+        taken = {segment['name'] for segment in segments}
+        replaced = {}
+        staged = {}
+        for month, first, last in groups:
+            group = segments[first:last]
+            base = month
+            if any(segment['name'] == f"{month}.jsonl.gz" for segment in group):
+                base = month + MERGING  # The partition being rewritten still holds the name
+                staged[f"{base}.jsonl.gz"] = month
+            suffix = 1
+            while f"{base}.jsonl.gz" in taken:
+                suffix += 1
+                base = f"{month}-{suffix}"
+            name = f"{base}.jsonl.gz"
+            links = f"{base}.links.gz"
+            taken.add(name)
+            logging.info(f"Sealing {len(group)} segment(s) of {month} into {name}")
+            write_atomic_gzip(self._path(name), self._iter_lines(group, 'name'))
+            write_atomic_gzip(self._path(links), self._iter_lines(group, 'links'))
+            oldest = [segment['oldest'] for segment in group if segment['oldest'] is not None]
+            newest = [segment['newest'] for segment in group if segment['newest'] is not None]
+            replaced[first] = (last, {
+                'name': name,
+                'links': links,
+                'count': sum(segment['count'] for segment in group),
+                'oldest': min(oldest) if oldest else None,
+                'newest': max(newest) if newest else None,
+                'sealed': True,
+            })
+
+        compacted = []
+        i = 0
+        while i < len(segments):
+            if i in replaced:
+                i, partition = replaced[i]
+                compacted.append(partition)
+            else:
+                compacted.append(segments[i])
+                i += 1
+        self._commit(dict(self.manifest, segments=compacted,
+                          next_segment=self.manifest.get('next_segment', len(segments) + 1)))
+
+        for first, (last, _) in replaced.items():
+            self._remove(segments[first:last])
+
+        if staged:
+            # Give the rewritten partitions their month's name back
+            merged = []
+            for i, partition in enumerate(compacted):
+                if partition['name'] in staged:
+                    month = staged[partition['name']]
+                    merged.append(partition)
+                    compacted[i] = dict(partition, name=f"{month}.jsonl.gz", links=f"{month}.links.gz")
+                    copy_atomic(self._path(partition['name']), self._path(compacted[i]['name']))
+                    copy_atomic(self._path(partition['links']), self._path(compacted[i]['links']))
+            self._commit(dict(self.manifest, segments=compacted))
+            self._remove(merged)
+        return len(groups)
+
+    def _remove(self, segments):
+        for segment in segments:
+            for name in (segment['name'], segment['links']):
+                try:
+                    os.remove(self._path(name))
+                except OSError as e:
+                    logging.warning(f"Could not remove compacted file {name}: {e}")
+
+    def _iter_lines(self, segments, key):
+        for segment in segments:
+            with self._open(segment[key]) as f:
+                yield from f
+
+    def _column_rows(self):
+        """
+        Returns the number of stored articles that the column files cover.
+        """
+        return min(complete_rows(self.root), len(self))
+
+    def sync_columns(self):
+        """
+        Appends the articles that the column files do not cover yet: those
+        committed before the files existed or while COLUMNS_ENABLED was
+        off, or all of them if the files (or strings.json) were lost.
+        """
+        if not _columns_enabled():
+            return
+        covered = self._column_rows()
+        if covered >= len(self):
+            return
+        logging.info(f"Writing columns for {len(self) - covered} article(s)...")
+        for rows, articles in self.iter_batches(covered):
+            append_columns(self.root, articles, rows - len(articles))
+
+    def iter_articles(self, start=None, end=None):
+        """
+        Yields stored articles as Article records, oldest segment first.
+        With `start` / `end` (aware datetimes), only segments overlapping
+        the range are read and only articles published within it are returned.
+        """
+        start_ts = start.timestamp() if start else None
+        end_ts = end.timestamp() if end else None
+        for segment in self.manifest['segments']:
+            if start_ts is not None or end_ts is not None:
+                if segment['newest'] is None:
+                    continue
+                if start_ts is not None and segment['newest'] < start_ts:
+                    continue
+                if end_ts is not None and segment['oldest'] > end_ts:
+                    continue
+            with self._open(segment['name']) as f:
+                for line in f:
+                    article = Article.from_dict(json.loads(line))
+                    if start_ts is not None or end_ts is not None:
+                        ts = article_timestamp(article)
+                        if ts is None:
+                            continue
+                        if start_ts is not None and ts < start_ts:
+                            continue
+                        if end_ts is not None and ts > end_ts:
+                            continue
+                    yield article
+
+    def iter_batches(self, skip=0):
+        """
+        Yields (articles covered, list of Article records) for the stored
+        articles after the first `skip`, one batch per segment, oldest
+        first. `articles covered` counts the stored articles up to the end
+        of the batch, so a derived index can record it and resume from it
+        later; sealing months keeps the order, so such counts stay valid.
+        """
+        covered = 0
+        for segment in self.manifest['segments']:
+            covered += segment['count']
+            if covered <= skip:
+                continue
+            with self._open(segment['name']) as f:
+                lines = itertools.islice(f, max(0, skip - (covered - segment['count'])), None)
+                yield covered, [Article.from_dict(json.loads(line)) for line in lines]
+
+    def latest(self, n):
+        """
+        Returns the `n` most recently published articles, reading segments
+        from the newest backwards only until the rest cannot be newer.
+        """
+        found = []
+        for segment in reversed(self.manifest['segments']):
+            if len(found) >= n and segment['newest'] is not None:
+                cutoff = article_timestamp(found[n - 1]) or 0
+                if segment['newest'] < cutoff:
+                    continue
+            with self._open(segment['name']) as f:
+                found.extend(Article.from_dict(json.loads(line)) for line in f)
+            found.sort(key=lambda a: article_timestamp(a) or 0, reverse=True)
+            del found[n:]
+        return found
+
+    def import_json(self, path):
+        """
+        Imports a JSON array archive (e.g. articles_historical.json),
+        skipping links that are already stored.
+
+        The file is streamed and committed IMPORT_SEGMENT_SIZE articles at a
+        time (each segment sorted oldest first), so memory stays bounded
+        however large the archive is.
+        """
+        imported = 0
+        batch = []
+        for article in iter_json_array(path):
+            batch.append(article)
+            if len(batch) >= IMPORT_SEGMENT_SIZE:
+                imported += self._import_batch(batch)
+                batch = []
+        if batch:
+            imported += self._import_batch(batch)
+        self.compact()
+        logging.info(f"Imported {imported} articles from {path} into {self.root}")
+        return imported
+
+    def _import_batch(self, articles):
+        normalize_dates(articles)
+        articles.sort(key=lambda article: article_timestamp(article) or 0)
+        return len(self.append(articles))
+
+    def export_json(self, path):
+        """
+        Writes the whole archive as one JSON array, newest first, in the
+        format of the legacy articles_historical.json.
+        """
+        articles = sorted(self.iter_articles(), key=lambda a: article_timestamp(a) or 0, reverse=True)
+        write_atomic(path, lambda f: json.dump(articles, f, indent=4, default=to_json))
+        logging.info(f"Exported {len(articles)} articles to {path}")
+        return len(articles)
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if sys.argv[1:] == ['compact']:
+        ArticleStore().compact()
+        sys.exit(0)
+    if sys.argv[1:] == ['reseal']:
+        ArticleStore().reseal()
+        sys.exit(0)
+    if len(sys.argv) != 3 or sys.argv[1] not in ('import', 'export'):
+        print("Usage: python storage.py import|export <articles.json>")
+        print("       python storage.py compact|reseal")
+        sys.exit(1)
+    store = ArticleStore()
+    if sys.argv[1] == 'import':
+        store.import_json(sys.argv[2])
+    else:
+        store.export_json(sys.argv[2])
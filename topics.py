@@ -0,0 +1,128 @@
+from collections import deque
+
+import config
+
+
+def load_topics(query=None):
+    """
+    Normalizes SEARCH_QUERY into {topic_name: [keywords]}.
+
+    SEARCH_QUERY may be a single keyword ("India"), a list of keywords
+    (each its own topic) or a dict mapping topic names to a keyword or a
+    list of keywords. A keyword ending in '*' matches as a word prefix
+    ("India*" also matches "Indian").
+    """
+    if query is None:
+        query = config.SEARCH_QUERY
+    if isinstance(query, str):
+        return {query: [query]}
+    if isinstance(query, dict):
+        return {
+            topic: [keywords] if isinstance(keywords, str) else list(keywords)
+            for topic, keywords in query.items()
+        }
+    return {keyword: [keyword] for keyword in query}
+
+
+def describe_query(query=None):
+    """
+    Human-readable list of the configured topics, for titles and logs.
+    """
+    return ", ".join(load_topics(query))
+
+
+def newsapi_query(query=None):
+    """
+    Builds one NewsAPI 'q' expression covering every keyword of every topic.
+    """
+    terms = []
+    for keywords in load_topics(query).values():
+        for keyword in keywords:
+            keyword = keyword.rstrip('*')
+            term = f'"{keyword}"' if ' ' in keyword else keyword
+            if term not in terms:
+                terms.append(term)
+    return " OR ".join(terms)
+
+
+class TopicMatcher:
+    """
+    Aho-Corasick automaton over all topic keywords.
+
+    match() scans a text once, however many topics and keywords there are,
+    and returns the topics with at least one keyword occurring on word
+    boundaries (case-insensitive).
+    """
+
+    def __init__(self, topics):
+        self.topic_names = list(topics)
+        # Trie as parallel arrays: child transitions, failure links and
+        # outputs of (keyword length, topic index, prefix-only) per node
+        self.children = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+
+        for topic_index, keywords in enumerate(topics.values()):
+            for keyword in keywords:
+                prefix = keyword.endswith('*')
+                keyword = keyword.rstrip('*').lower()
+                if not keyword:
+                    continue
+                node = 0
+                for char in keyword:
+                    nxt = self.children[node].get(char)
+                    if nxt is None:
+                        nxt = len(self.children)
+                        self.children[node][char] = nxt
+                        self.children.append({})
+                        self.fail.append(0)
+                        self.outputs.append([])
+                    node = nxt
+                self.outputs[node].append((len(keyword), topic_index, prefix))
+
+        # Breadth-first pass to set failure links and merge their outputs
+        queue = deque(self.children[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.children[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.children[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.children[state].get(char, 0)
+                if self.fail[child] == child:
+                    self.fail[child] = 0
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def match(self, text):
+        """
+        Returns the names of the topics matched in `text`, in config order.
+        """
+        if not text:
+            return []
+        text = text.lower()
+        n = len(text)
+        children, fail, outputs = self.children, self.fail, self.outputs
+        found = set()
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in children[node]:
+                node = fail[node]
+            node = children[node].get(char, 0)
+            for length, topic_index, prefix in outputs[node]:
+                if topic_index in found:
+                    continue
+                start = i - length + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if not prefix and i + 1 < n and text[i + 1].isalnum():
+                    continue
+                found.add(topic_index)
+        return [self.topic_names[index] for index in sorted(found)]
+
+
+def get_matcher(query=None):
+    """
+    Returns a TopicMatcher for the configured topics.
+    """
+    return TopicMatcher(load_topics(query))